@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http:##www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import sys
+import math
+import logging
+import argparse
+
+from util import *
+from util.histogram import Histogram
+
+logging.basicConfig(level = logging.INFO,
+                    format="%(asctime)s [%(funcName)s:%(lineno)03d] %(levelname)-5s: %(message)s",
+                    datefmt="%m-%d-%Y %H:%M:%S",
+                    stream = sys.stdout)
+
+## The run-level metadata that is printed when it differs from the baseline
+METADATA_KEYS = [ "driver", "warehouses", "scalefactor", "mix", "clients", "threads_per_client", "terminals", "revision", "host" ]
+
+## ==============================================
+## betai
+## ==============================================
+def betai(a, b, x):
+    """Regularized incomplete beta function I_x(a, b)"""
+    if x <= 0: return 0.0
+    if x >= 1: return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return front * betacf(a, b, x) / a
+    return 1.0 - front * betacf(b, a, 1 - x) / b
+## DEF
+
+def betacf(a, b, x):
+    """Continued fraction for betai(), see Numerical Recipes 6.4"""
+    tiny = 1e-30
+    c = 1.0
+    d = 1.0 - (a + b) * x / (a + 1)
+    if abs(d) < tiny: d = tiny
+    d = 1.0 / d
+    h = d
+    for m in range(1, 200):
+        for num in [ m * (b - m) * x / ((a + 2*m - 1) * (a + 2*m)),
+                     -(a + m) * (a + b + m) * x / ((a + 2*m) * (a + 2*m + 1)) ]:
+            d = 1.0 + num * d
+            if abs(d) < tiny: d = tiny
+            c = 1.0 + num / c
+            if abs(c) < tiny: c = tiny
+            d = 1.0 / d
+            h *= d * c
+        ## FOR
+        if abs(d * c - 1.0) < 1e-10: break
+    ## FOR
+    return h
+## DEF
+
+## ==============================================
+## welchTest
+## ==============================================
+def welchTest(a, b):
+    """Two-sided Welch's t-test of the samples a and b. Returns the p-value,
+    or None if there are not enough samples."""
+    if len(a) < 2 or len(b) < 2: return None
+    ma = sum(a) / float(len(a))
+    mb = sum(b) / float(len(b))
+    va = sum([ (x - ma) ** 2 for x in a ]) / (len(a) - 1) / len(a)
+    vb = sum([ (x - mb) ** 2 for x in b ]) / (len(b) - 1) / len(b)
+    if va + vb == 0: return 1.0 if ma == mb else 0.0
+    t = (mb - ma) / math.sqrt(va + vb)
+    df = (va + vb) ** 2 / (va ** 2 / (len(a) - 1) + vb ** 2 / (len(b) - 1))
+    return betai(df / 2.0, 0.5, df / (df + t * t))
+## DEF
+
+## ==============================================
+## getMeasuredBuckets
+## ==============================================
+def getMeasuredBuckets(r):
+    """Return the time series buckets that lie entirely in the measurement interval"""
+    ts = r["timeseries"]
+    if ts == None: return [ ]
+    buckets = [ ]
+    for idx in sorted(ts.buckets.keys()):
+        start = idx * ts.interval
+        if start >= r["measure_start"] and start + ts.interval <= r["measure_stop"]:
+            buckets.append(ts.buckets[idx])
+    ## FOR
+    return buckets
+## DEF
+
+## ==============================================
+## getSamples
+## ==============================================
+def getSamples(r, txn, metric):
+    """Return the per-interval samples of a metric for one transaction type (or all if txn is None)"""
+    samples = [ ]
+    for bucket in getMeasuredBuckets(r):
+        stats = [ bucket[t] for t in bucket.keys() if txn == None or t == txn ]
+        if metric == "rate":
+            samples.append(sum([ s[0] for s in stats ]) / r["timeseries"].interval)
+            continue
+        hist = Histogram()
+        for s in stats: hist.mergeSparse(s[2])
+        if hist.count > 0: samples.append(hist.percentile(float(metric[1:])))
+    ## FOR
+    return samples
+## DEF
+
+## ==============================================
+## getValue
+## ==============================================
+def getValue(r, txn, metric):
+    stats = r["total"] if txn == None else r["txns"].get(txn)
+    if stats == None: return None
+    if metric == "rate": return stats["rate"]
+    return stats["percentiles"].get(metric[1:])
+## DEF
+
+## ==============================================
+## compareRuns
+## ==============================================
+def compareRuns(base, run, threshold, alpha):
+    """Print the comparison of two exports. Returns the number of regressions."""
+    col_width = 14
+    f = "\n  " + "%-14s%-8s" + (("%-" + str(col_width) + "s")*4) + "%s"
+    ret = "Baseline: %s\nRun:      %s\n" % (base["path"], run["path"])
+    for key in METADATA_KEYS:
+        if base["metadata"].get(key) != run["metadata"].get(key):
+            ret += "  %-20s %s -> %s\n" % (key, base["metadata"].get(key), run["metadata"].get(key))
+    ## FOR
+    ret += "-"*86
+    ret += f % ("", "", "Baseline", "Run", "Change", "p-value", "")
+
+    b = base["results"]
+    r = run["results"]
+    txns = sorted(set(b["txns"].keys()) | set(r["txns"].keys()))
+    metrics = [ "rate" ] + [ "p%s" % p for p in results.PERCENTILES ]
+    regressions = 0
+    for txn in txns + [ None ]:
+        for metric in metrics:
+            old = getValue(b, txn, metric)
+            new = getValue(r, txn, metric)
+            if old == None or new == None or old == 0: continue
+            change = (new - old) / float(old)
+            
+            ## Throughput should not go down, latencies should not go up
+            worse = -change if metric == "rate" else change
+            pvalue = welchTest(getSamples(b, txn, metric), getSamples(r, txn, metric))
+            significant = pvalue == None or pvalue < alpha
+            flag = ""
+            if worse > threshold and significant:
+                flag = "REGRESSION"
+                regressions += 1
+            elif -worse > threshold and significant:
+                flag = "improvement"
+            ret += f % (txn or "TOTAL", metric, "%.2f" % old, "%.2f" % new, "%+.1f%%" % (change * 100),
+                        "%.4f" % pvalue if pvalue != None else "-", flag)
+        ## FOR
+    ## FOR
+    print ret
+    print
+    return regressions
+## DEF
+
+## ==============================================
+## main
+## ==============================================
+if __name__ == '__main__':
+    aparser = argparse.ArgumentParser(description='Compare the results exported by tpcc.py --export against a baseline')
+    aparser.add_argument('baseline',
+                         help='Export of the baseline run')
+    aparser.add_argument('runs', nargs='+',
+                         help='Exports of the runs to compare against the baseline')
+    aparser.add_argument('--threshold', default=0.05, type=float, metavar='T',
+                         help='Smallest relative change that is reported as a regression')
+    aparser.add_argument('--alpha', default=0.05, type=float, metavar='A',
+                         help='Significance level of the per-interval t-test')
+    aparser.add_argument('--debug', action='store_true',
+                         help='Enable debug log messages')
+    args = vars(aparser.parse_args())
+
+    if args['debug']: logging.getLogger().setLevel(logging.DEBUG)
+
+    ## Without a time series there are no per-interval samples, and any
+    ## change above the threshold is reported
+    exports = [ ]
+    for path in [ args['baseline'] ] + args['runs']:
+        data = export.readExport(path)
+        data["path"] = path
+        if data["results"]["timeseries"] == None:
+            logging.warn("'%s' has no time series (run with --timeseries), the changes cannot be tested for significance" % path)
+        exports.append(data)
+    ## FOR
+
+    regressions = 0
+    for run in exports[1:]:
+        regressions += compareRuns(exports[0], run, args['threshold'], args['alpha'])
+    if regressions > 0:
+        logging.warn("Found %d regressions" % regressions)
+        sys.exit(1)
+## MAIN
@@ -92,6 +92,29 @@ def startLoading(scalParameters,args,config,channels):
     return time.time()-load_start
 
 
+## ==============================================
+## estimateClockOffset
+## ==============================================
+def estimateClockOffset(channel, rounds = 5):
+    """Estimate how far the worker's clock is ahead of ours by pinging it a few times.
+    The round trip with the smallest delay gives the best estimate (Cristian's algorithm)."""
+    best = None
+    for i in range(rounds):
+        m=message.Message(header=message.CMD_PING)
+        sent = time.time()
+        channel.send(pickle.dumps(m,-1))
+        reply = pickle.loads(channel.receive())
+        received = time.time()
+        assert reply.header == message.PING_REPLY
+        
+        rtt = received - sent
+        offset = reply.data - (sent + received) / 2.0
+        if best == None or rtt < best[0]: best = (rtt, offset)
+    ## FOR
+    logging.debug("Clock offset %.6f seconds (round trip %.6f seconds)" % (best[1], best[0]))
+    return best[1]
+## DEF
+
 ## ==============================================
 ## startExecution
 ## ==============================================
@@ -99,11 +122,14 @@ def startExecution(scaleParameters, args, config,channels):
     procs = len(channels)
     total_results = results.Results()
     
+    ## The workers' times are moved onto our clock before they are merged
+    offsets = [ estimateClockOffset(ch) for ch in channels ]
     for ch in channels:
         m=message.Message(header=message.CMD_EXECUTE,data=[scaleParameters,args,config])
         ch.send(pickle.dumps(m,-1))
-    for ch in channels:
-        r=pickle.loads(ch.receive()).data
+    for i in range(len(channels)):
+        r=pickle.loads(channels[i].receive()).data
+        r.shiftClock(-offsets[i])
         total_results.append(r)
     return (total_results)
 ## DEF
@@ -126,6 +152,14 @@ if __name__ == '__main__':
                          help='Number of Warehouses')
     aparser.add_argument('--duration', default=60, type=int, metavar='D',
                          help='How long to run the benchmark in seconds')
+    aparser.add_argument('--timeseries', default=None, metavar='PATH',
+                         help='Stream per-interval throughput and latency on every client and write the merged timeline to PATH')
+    aparser.add_argument('--interval', default=1.0, type=float, metavar='I',
+                         help='Length of the --timeseries intervals in seconds')
+    aparser.add_argument('--export', default=None, metavar='PATH',
+                         help='Write the results and the run metadata to PATH as JSON. With --timeseries, the intervals are included and also written to a .csv next to it')
+    aparser.add_argument('--statement-timing', action='store_true',
+                         help='Time every SQL statement of the drivers that support it and report them per transaction')
     aparser.add_argument('--ddl', default=os.path.realpath(os.path.join(os.path.dirname(__file__), "tpcc.sql")),
                          help='Path to the TPC-C DDL SQL file')
     ## number of processes per node
@@ -169,6 +203,7 @@ if __name__ == '__main__':
         config = dict(map(lambda x: (x, defaultConfig[x][1]), defaultConfig.keys()))
     config['reset'] = args['reset']
     config['load'] = False
+    config['statement_timing'] = args['statement_timing']
     config['execute'] = False
     if config['reset']: logging.info("Reseting database")
     driver.loadConfig(config)
@@ -208,6 +243,10 @@ if __name__ == '__main__':
     if not args['no_execute']:
         results = startExecution(scaleParameters, args, config,channels)
         assert results
+        if args['timeseries']: results.timeseries.write(args['timeseries'])
+        if args['export']:
+            metadata = export.makeMetadata(args, config, len(channels))
+            export.writeExport(args['export'], results, metadata)
         print results.show(load_time)
     ## IF
     
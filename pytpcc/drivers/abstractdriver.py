@@ -24,9 +24,11 @@
 # OTHER DEALINGS IN THE SOFTWARE.
 # -----------------------------------------------------------------------
 
+import time
 from datetime import datetime
 
 import constants
+from util.histogram import Histogram
 
 ## ==============================================
 ## AbstractDriver
@@ -36,6 +38,8 @@ class AbstractDriver(object):
         self.name = name
         self.driver_name = "%sDriver" % self.name.title()
         self.ddl = ddl
+        self.statement_stats = None
+        self.statement_names = None
         
     def __str__(self):
         return self.driver_name
@@ -83,6 +87,17 @@ class AbstractDriver(object):
         """Optional callback to indicate to the driver that the data for the given district is finished."""
         return None
         
+    def loadCommit(self):
+        """Optional callback to make every tuple passed so far durable. It is invoked after
+        each work unit, which is then recorded as done if the load is checkpointed."""
+        return None
+        
+    def loadWholeDistricts(self):
+        """Return true if loadTuples must receive all of a district's tuples for a table
+        in a single call. Otherwise they are streamed in batches, with the rows of a
+        table always arriving after the CUSTOMER or ORDERS rows that they refer to."""
+        return False
+        
     def loadTuples(self, tableName, tuples):
         """Load a list of tuples into the target table"""
         raise NotImplementedError("%s does not implement loadTuples" % (self.driver_name))
@@ -111,7 +126,57 @@ class AbstractDriver(object):
         else:
             assert False, "Unexpected TransactionType: " + txn
         return result
+
+    def instrumentCursor(self, cursor, config, queries):
+        """Optional statement-level timing for drivers that run the queries of a
+        TXN_QUERIES style {txn: {name: sql}} dict through a DB-API cursor.
+        If config['statement_timing'] is set, this returns a cursor that times every
+        execute() of a known query per (txn, name). Otherwise it returns the cursor
+        itself, so the driver pays nothing when the timing is off."""
+        if not config.get('statement_timing'): return cursor
+        self.statement_stats = { }
+        self.statement_names = { }
+        for txn, txn_queries in queries.iteritems():
+            for name, sql in txn_queries.iteritems():
+                self.nameStatement(sql, txn, name)
+        ## FOR
+        return TimedCursor(cursor, self.statement_names, self.statement_stats)
+        
+    def nameStatement(self, sql, txn, name):
+        """Time the given SQL as the query 'name' of 'txn'. Drivers use this for the
+        statements that they build from a template at runtime."""
+        if self.statement_names != None: self.statement_names[sql] = (txn, name)
         
+    def getStatementStats(self):
+        """Return the {(txn, name): [count, total time, Histogram]} timings of the
+        statements, or None if statement timing is off"""
+        return self.statement_stats
+
+    def rollbackTransaction(self):
+        """Optional callback after a transaction failed, to roll back whatever it
+        left open before the connection is used again"""
+        return None
+        
+    def isRetryable(self, error):
+        """Return true if the given exception aborted a transaction only because of
+        contention, e.g. a serialization failure or a deadlock, so that running it
+        again with the same parameters may succeed"""
+        return False
+
+    def supportsAsync(self):
+        """Return true if the driver implements executeTransactionAsync"""
+        return False
+
+    def executeTransactionAsync(self, txn, params, callback):
+        """Optional non-blocking version of executeTransaction.
+        Start the transaction and return immediately. When it finishes the driver
+        must invoke callback(result, error), where error is the exception that
+        aborted the transaction or None. The callback may be invoked from any thread.
+        A driver that retries the transaction itself can pass the number of retries
+        as a third argument.
+        """
+        raise NotImplementedError("%s does not implement executeTransactionAsync" % (self.driver_name))
+
     def doDelivery(self, params):
         """Execute DELIVERY Transaction
         Parameters Dict:
@@ -166,4 +231,36 @@ class AbstractDriver(object):
             threshold
         """
         raise NotImplementedError("%s does not implement doStockLevel" % (self.driver_name))
-## CLASS
\ No newline at end of file
+## CLASS
+
+## ==============================================
+## TimedCursor
+## ==============================================
+class TimedCursor(object):
+    """DB-API cursor wrapper used by AbstractDriver.instrumentCursor()"""
+    
+    def __init__(self, cursor, names, stats):
+        self.cursor = cursor
+        self.names = names
+        self.stats = stats
+        
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+        
+    def __iter__(self):
+        return iter(self.cursor)
+        
+    def execute(self, sql, *args):
+        key = self.names.get(sql)
+        if key == None: return self.cursor.execute(sql, *args)
+        start = time.time()
+        ret = self.cursor.execute(sql, *args)
+        duration = time.time() - start
+        
+        stats = self.stats.get(key)
+        if stats == None: stats = self.stats[key] = [ 0, 0.0, Histogram() ]
+        stats[0] += 1
+        stats[1] += duration
+        stats[2].record(duration)
+        return ret
+## CLASS
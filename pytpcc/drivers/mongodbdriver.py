@@ -319,6 +319,14 @@ class MongodbDriver(AbstractDriver):
         
         return
         
+    ## ----------------------------------------------
+    ## loadWholeDistricts
+    ## ----------------------------------------------
+    def loadWholeDistricts(self):
+        ## The denormalized CUSTOMER documents are only pushed in loadFinishDistrict,
+        ## so there is nothing to gain from smaller batches
+        return self.denormalize
+        
     ## ----------------------------------------------
     ## loadFinishDistrict
     ## ----------------------------------------------
@@ -135,8 +135,30 @@ class PostgresDriver(AbstractDriver):
         self.reset = bool(config["reset"])
                     
         self.conn = psycopg2.connect(self.database)
-        self.cursor = self.conn.cursor()
+        self.cursor = self.instrumentCursor(self.conn.cursor(), config, TXN_QUERIES)
         self.cursor.execute("SET search_path TO %s"%self.schema)
+        
+        ## getStockInfo reads the s_dist_xx column of the order's district
+        self.stock_info = { }
+        for d_id in range(1, constants.DISTRICTS_PER_WAREHOUSE+1):
+            sql = SQL(TXN_QUERIES["NEW_ORDER"]["getStockInfo"]).format(Identifier('s_dist_%02d'%d_id))
+            self.stock_info[d_id] = sql.as_string(self.conn)
+            self.nameStatement(self.stock_info[d_id], "NEW_ORDER", "getStockInfo")
+        ## FOR
+
+    ## ----------------------------------------------
+    ## rollbackTransaction
+    ## ----------------------------------------------
+    def rollbackTransaction(self):
+        self.conn.rollback()
+        
+    ## ----------------------------------------------
+    ## isRetryable
+    ## ----------------------------------------------
+    def isRetryable(self, error):
+        ## serialization_failure and deadlock_detected
+        if isinstance(error, psycopg2.extensions.TransactionRollbackError): return True
+        return getattr(error, "pgcode", None) in ("40001", "40P01")
 
     ## ----------------------------------------------
     ## loadStart
@@ -165,11 +187,17 @@ class PostgresDriver(AbstractDriver):
         p = ["%s"]*len(tuples[0])
         sql = "INSERT INTO %s VALUES (%s)" % (tableName, ",".join(p))
         self.cursor.executemany(sql, tuples)
-        self.conn.commit()
 
         logging.debug("Loaded %d tuples for tableName %s" % (len(tuples), tableName))
         return
 
+    ## ----------------------------------------------
+    ## loadCommit
+    ## ----------------------------------------------
+    def loadCommit(self):
+        ## A work unit is committed as a whole, so a resumed load never finds half of it
+        self.conn.commit()
+
     ## ----------------------------------------------
     ## loadFinish
     ## ----------------------------------------------
@@ -298,7 +326,7 @@ class PostgresDriver(AbstractDriver):
             i_data = itemInfo[2]
             i_price = itemInfo[0]
 
-            self.cursor.execute(SQL(q["getStockInfo"]).format(Identifier('s_dist_%02d'%d_id)), [ol_i_id, ol_supply_w_id])
+            self.cursor.execute(self.stock_info[d_id], [ol_i_id, ol_supply_w_id])
             stockInfo = self.cursor.fetchone()
             if len(stockInfo) == 0:
                 logging.warn("No STOCK record for (ol_i_id=%d, ol_supply_w_id=%d)" % (ol_i_id, ol_supply_w_id))
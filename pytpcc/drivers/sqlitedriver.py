@@ -140,7 +140,29 @@ class SqliteDriver(AbstractDriver):
         ## IF
             
         self.conn = sqlite3.connect(self.database)
-        self.cursor = self.conn.cursor()
+        self.cursor = self.instrumentCursor(self.conn.cursor(), config, TXN_QUERIES)
+        
+        ## getStockInfo reads the S_DIST_XX column of the order's district
+        self.stock_info = { }
+        for d_id in range(1, constants.DISTRICTS_PER_WAREHOUSE+1):
+            self.stock_info[d_id] = TXN_QUERIES["NEW_ORDER"]["getStockInfo"] % (d_id)
+            self.nameStatement(self.stock_info[d_id], "NEW_ORDER", "getStockInfo")
+        ## FOR
+    
+    ## ----------------------------------------------
+    ## rollbackTransaction
+    ## ----------------------------------------------
+    def rollbackTransaction(self):
+        self.conn.rollback()
+        
+    ## ----------------------------------------------
+    ## isRetryable
+    ## ----------------------------------------------
+    def isRetryable(self, error):
+        ## Another connection holds the lock we need
+        if not isinstance(error, sqlite3.OperationalError): return False
+        msg = str(error)
+        return msg.find("locked") >= 0 or msg.find("busy") >= 0
     
     ## ----------------------------------------------
     ## loadTuples
@@ -155,6 +177,12 @@ class SqliteDriver(AbstractDriver):
         logging.debug("Loaded %d tuples for tableName %s" % (len(tuples), tableName))
         return
 
+    ## ----------------------------------------------
+    ## loadCommit
+    ## ----------------------------------------------
+    def loadCommit(self):
+        self.conn.commit()
+
     ## ----------------------------------------------
     ## loadFinish
     ## ----------------------------------------------
@@ -283,7 +311,7 @@ class SqliteDriver(AbstractDriver):
             i_data = itemInfo[2]
             i_price = itemInfo[0]
 
-            self.cursor.execute(q["getStockInfo"] % (d_id), [ol_i_id, ol_supply_w_id])
+            self.cursor.execute(self.stock_info[d_id], [ol_i_id, ol_supply_w_id])
             stockInfo = self.cursor.fetchone()
             if len(stockInfo) == 0:
                 logging.warn("No STOCK record for (ol_i_id=%d, ol_supply_w_id=%d)" % (ol_i_id, ol_supply_w_id))
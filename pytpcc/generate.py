@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http:##www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import sys
+import os
+import random
+import logging
+import argparse
+import multiprocessing
+
+from util import *
+from runtime import *
+
+logging.basicConfig(level = logging.INFO,
+                    format="%(asctime)s [%(funcName)s:%(lineno)03d] %(levelname)-5s: %(message)s",
+                    datefmt="%m-%d-%Y %H:%M:%S",
+                    stream = sys.stdout)
+
+## The segment writer and loader of this generator process, see initGenerator()
+generator = None
+
+## ==============================================
+## initGenerator
+## ==============================================
+def initGenerator(path, scaleParameters, seed):
+    global generator
+    writer = datacache.SegmentWriter(path)
+    generator = (writer, loader.Loader(writer, scaleParameters, [ ], False, seed))
+## DEF
+
+## ==============================================
+## generateUnit
+## ==============================================
+def generateUnit(unit):
+    writer, l = generator
+    writer.startUnit(unit)
+    l.loadUnit(unit)
+    writer.finishUnit()
+    return unit
+## DEF
+
+## ==============================================
+## main
+## ==============================================
+if __name__ == '__main__':
+    aparser = argparse.ArgumentParser(description='Generate a TPC-C dataset once, for tpcc.py --cache to load into any database')
+    aparser.add_argument('dir',
+                         help='Directory that keeps the datasets')
+    aparser.add_argument('--warehouses', default=4, type=int, metavar='W',
+                         help='Number of Warehouses')
+    aparser.add_argument('--scalefactor', default=1, type=float, metavar='SF',
+                         help='Benchmark scale factor')
+    aparser.add_argument('--seed', default=datacache.DEFAULT_SEED, type=int, metavar='S',
+                         help='Seed of the random generators')
+    aparser.add_argument('--clients', default=1, type=int, metavar='N',
+                         help='The number of generator processes to fork')
+    aparser.add_argument('--debug', action='store_true',
+                         help='Enable debug log messages')
+    args = vars(aparser.parse_args())
+
+    if args['debug']: logging.getLogger().setLevel(logging.DEBUG)
+
+    scaleParameters = scaleparameters.makeWithScaleFactor(args['warehouses'], args['scalefactor'])
+    random.seed(args['seed'])
+    rand.setNURand(nurand.makeForLoad())
+
+    path = datacache.cachePath(args['dir'], args['warehouses'], args['scalefactor'], args['seed'])
+    if not os.path.exists(path): os.makedirs(path)
+
+    ## The segments that are already there are kept, so an interrupted run can be picked up
+    units = loader.makeWorkUnits(scaleParameters, range(1, scaleParameters.warehouses+1), True)
+    units = [ unit for unit in units if not os.path.exists(datacache.segmentPath(path, unit)) ]
+    logging.info("Generating %d work units into '%s' with %d processes" % (len(units), path, args['clients']))
+
+    pool = multiprocessing.Pool(args['clients'], initializer=initGenerator, initargs=(path, scaleParameters, args['seed']))
+    for i, unit in enumerate(pool.imap_unordered(generateUnit, units)):
+        logging.debug("Generated %s [%d / %d]" % (unit, i+1, len(units)))
+    pool.close()
+    pool.join()
+
+    ## The dataset is only usable once the metadata is there
+    datacache.writeMetadata(path, scaleParameters, args['scalefactor'], args['seed'])
+    logging.info("Finished generating '%s'" % path)
+## MAIN
@@ -46,6 +46,8 @@ CMD_EXECUTE = 2
 CMD_STOP = 3
 LOAD_COMPLETED = 4
 EXECUTE_COMPLETED = 5
+CMD_PING = 6
+PING_REPLY = 7
  
 class Message:
     def __init__(self,header=EMPTY,data=None):
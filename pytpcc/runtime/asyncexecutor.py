@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import time
+import logging
+import threading
+import Queue
+
+import constants
+from executor import Executor, makeHome, executeWithRetry
+
+## ==============================================
+## AsyncExecutor
+## ==============================================
+class AsyncExecutor(Executor):
+    """
+        Runs several virtual terminals inside a single process.
+        Each terminal always has exactly one transaction in flight. Transactions
+        are handed to the driver's executeTransactionAsync if it has one, otherwise
+        to a bounded pool of threads that each own a separate driver connection.
+        All completions come back through one queue, so the Results bookkeeping
+        only ever happens in the thread that called execute().
+    """
+
+    def __init__(self, driver, scaleParameters, txnprob, terminals, makeDriver = None, pool_size = None, terminal_id = None, **kwargs):
+        Executor.__init__(self, driver, scaleParameters, txnprob, **kwargs)
+        assert terminals > 0
+        assert self.rate == None, "Open-loop mode is not supported with virtual terminals"
+        self.terminals = terminals
+
+        ## Each virtual terminal gets its own home starting at terminal_id
+        self.homes = [ None ] * terminals
+        if terminal_id != None:
+            self.homes = [ makeHome(scaleParameters, terminal_id + t) for t in range(terminals) ]
+        self.makeDriver = makeDriver
+        self.pool_size = pool_size if pool_size else terminals
+        self.completions = Queue.Queue()
+    ## DEF
+
+    def execute(self, duration):
+        r = self.makeResults()
+
+        pool = None
+        if self.driver.supportsAsync():
+            submit = self.driver.executeTransactionAsync
+        else:
+            assert self.makeDriver != None, "%s is not asynchronous and no driver factory was given" % self.driver
+            pool = DriverPool(self.makeDriver, self.pool_size, self.retry_policy)
+            submit = pool.submit
+        ## IF
+
+        logging.info("Executing benchmark for %d seconds with %d virtual terminals" % (duration, self.terminals))
+        window = self.makeWindow(r, duration)
+        window.start()
+        inflight = 0
+        try:
+            for term in range(self.terminals):
+                if self.startOne(r, submit, term): inflight += 1
+            ## FOR
+
+            while inflight > 0:
+                if pool != None and pool.error != None: raise pool.error
+                try:
+                    ## HACK: Queue.get() without a timeout cannot be interrupted
+                    term, txn, txn_id, error, retries = self.completions.get(True, 1)
+                except Queue.Empty:
+                    continue
+                inflight -= 1
+                if retries > 0: r.retryTransaction(txn_id, retries)
+
+                if error != None:
+                    logging.warn("Failed to execute Transaction '%s': %s" % (txn, error))
+                    if self.stop_on_error: raise error
+                    r.abortTransaction(txn_id, error)
+                else:
+                    r.stopTransaction(txn_id)
+
+                ## Keep this terminal busy until the time is up
+                now = time.time()
+                if self.progress != None and now >= self.next_publish: self.publish(r, now)
+                if window.update(now):
+                    if self.startOne(r, submit, term): inflight += 1
+            ## WHILE
+        except KeyboardInterrupt:
+            return -1
+        finally:
+            if pool != None:
+                pool.shutdown()
+                for driver in pool.drivers: r.recordStatements(driver.getStatementStats())
+
+        r.stopBenchmark()
+        self.finish(r)
+        if self.progress != None: self.publish(r, r.stop)
+        return (r)
+    ## DEF
+
+    def startOne(self, r, submit, term):
+        """Start the next transaction for the given terminal. Returns false
+        if there is nothing left to run."""
+        self.home = self.homes[term]
+        txn, params = self.doOne()
+        if txn == None: return False
+        txn_id = r.startTransaction(txn)
+        completions = self.completions
+        def callback(result, error, retries = 0):
+            completions.put((term, txn, txn_id, error, retries))
+        
+        ## DELIVERY is deferred: the terminal only waits for it to be queued
+        if txn == constants.TransactionTypes.DELIVERY and self.delivery_queue != None:
+            self.delivery_queue.enqueue(params, r)
+            callback(None, None)
+            return True
+        submit(txn, params, callback)
+        return True
+    ## DEF
+## CLASS
+
+## ==============================================
+## DriverPool
+## ==============================================
+class DriverPool:
+    """Bounded pool of threads that run a synchronous driver's executeTransaction"""
+
+    def __init__(self, makeDriver, size, retry_policy = None):
+        assert size > 0
+        self.retry_policy = retry_policy
+        self.error = None
+        self.tasks = Queue.Queue()
+        self.threads = [ ]
+        self.drivers = [ ]
+        for i in range(size):
+            t = threading.Thread(target=self.run, args=(makeDriver,))
+            t.daemon = True
+            t.start()
+            self.threads.append(t)
+        ## FOR
+    ## DEF
+
+    def submit(self, txn, params, callback):
+        self.tasks.put((txn, params, callback))
+    ## DEF
+
+    def shutdown(self):
+        for t in self.threads:
+            self.tasks.put(None)
+        for t in self.threads:
+            t.join()
+    ## DEF
+
+    def run(self, makeDriver):
+        ## Without a driver this thread cannot run anything: the error is
+        ## picked up by AsyncExecutor.execute(), which gives up
+        try:
+            driver = makeDriver()
+            driver.executeStart()
+        except Exception, ex:
+            logging.error("Failed to create a driver for the terminal pool: %s" % ex)
+            self.error = ex
+            return
+        self.drivers.append(driver)
+        
+        while True:
+            task = self.tasks.get()
+            if task == None: break
+            txn, params, callback = task
+            try:
+                val, error, retries = executeWithRetry(driver, txn, params, self.retry_policy)
+            except Exception, ex:
+                ## e.g. the rollback failed on a dead connection
+                val, error, retries = None, ex, 0
+            callback(val, error, retries)
+        ## WHILE
+        driver.executeFinish()
+    ## DEF
+## CLASS
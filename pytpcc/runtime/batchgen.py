@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+from datetime import datetime
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import constants
+from util import *
+
+DEFAULT_BATCH_SIZE = 4096
+
+## ==============================================
+## BatchGenerator
+## ==============================================
+class BatchGenerator(randvec.RandomColumns):
+    """
+        Pre-generates transaction parameters in batches using NumPy arrays.
+        Every column uses the same distribution as the matching function in
+        util/rand.py. The values are handed out one transaction at a time
+        through next(), which is the only place where the dicts get built.
+        The batches do not depend on a terminal's home warehouse, so a single
+        generator can be shared by terminals with different homes.
+    """
+
+    def __init__(self, scaleParameters, txnprob, batch_size = DEFAULT_BATCH_SIZE, deck = None):
+        assert numpy != None, "NumPy is required for batched parameter generation"
+        assert batch_size > 0
+        randvec.RandomColumns.__init__(self)
+        self.scaleParameters = scaleParameters
+        self.txnprob = txnprob
+        self.batch_size = batch_size
+        self.deck = deck
+
+        self.txnTypes = [ constants.TransactionTypes.STOCK_LEVEL,
+                          constants.TransactionTypes.DELIVERY,
+                          constants.TransactionTypes.ORDER_STATUS,
+                          constants.TransactionTypes.PAYMENT,
+                          constants.TransactionTypes.NEW_ORDER ]
+        self.batch = None
+        self.offset = self.batch_size
+    ## DEF
+
+    def next(self, home = None):
+        """Return the next (txn, params) pair, generating a new batch if needed.
+        If home is a (w_id, d_id) pair, the transaction is bound to that terminal."""
+        if self.offset >= self.batch_size:
+            self.fillBatch()
+        i = self.offset
+        self.offset += 1
+
+        b = self.batch
+        txn = self.txnTypes[b["txn"][i]]
+        w_id = home[0] if home != None else b["w_id"][i]
+        if txn == constants.TransactionTypes.STOCK_LEVEL:
+            d_id = home[1] if home != None else b["d_id"][i]
+            params = self.makeStockLevelParams(b, i, w_id, d_id)
+        elif txn == constants.TransactionTypes.DELIVERY:
+            params = self.makeDeliveryParams(b, i, w_id)
+        elif txn == constants.TransactionTypes.ORDER_STATUS:
+            params = self.makeOrderStatusParams(b, i, w_id)
+        elif txn == constants.TransactionTypes.PAYMENT:
+            params = self.makePaymentParams(b, i, w_id)
+        else:
+            params = self.makeNewOrderParams(b, i, w_id)
+        return (txn, params)
+    ## DEF
+
+    ## ----------------------------------------------
+    ## fillBatch
+    ## ----------------------------------------------
+    def fillBatch(self):
+        """Draw every random column for the next batch_size transactions"""
+        n = self.batch_size
+        sp = self.scaleParameters
+        b = { }
+
+        ## Transaction type, see Executor.selectTransaction()
+        if self.deck != None:
+            b["txn"] = [ self.deck.draw() for i in xrange(n) ]
+        else:
+            x = self.number(1, self.txnprob[4], n)
+            b["txn"] = numpy.searchsorted(numpy.array(self.txnprob), x).tolist()
+
+        b["w_id"] = self.number(sp.starting_warehouse, sp.ending_warehouse, n).tolist()
+        b["d_id"] = self.number(1, sp.districtsPerWarehouse, n).tolist()
+        b["c_id"] = self.NURand(1023, 1, sp.customersPerDistrict, n).tolist()
+        b["c_last"] = self.randomLastName(sp.customersPerDistrict, n).tolist()
+        b["by_name"] = (self.number(1, 100, n) <= 60).tolist()
+
+        ## DELIVERY
+        b["o_carrier_id"] = self.number(constants.MIN_CARRIER_ID, constants.MAX_CARRIER_ID, n).tolist()
+
+        ## NEW_ORDER
+        shape = (n, constants.MAX_OL_CNT)
+        b["ol_cnt"] = self.number(constants.MIN_OL_CNT, constants.MAX_OL_CNT, n).tolist()
+        b["i_ids"] = self.NURand(8191, 1, sp.items, shape).tolist()
+        b["i_qtys"] = self.number(1, constants.MAX_OL_QUANTITY, shape).tolist()
+
+        ## Remote warehouses are drawn from [starting, ending-1] and shifted
+        ## past the home warehouse when handed out, see rand.numberExcluding()
+        b["i_remote"] = None
+        b["remote"] = None
+        if sp.warehouses > 1:
+            b["i_remote"] = (self.number(1, 100, shape) == 1).tolist()
+            b["i_remote_w_id"] = self.number(sp.starting_warehouse, sp.ending_warehouse-1, shape).tolist()
+
+            ## PAYMENT
+            b["remote"] = (self.number(1, 100, n) > 85).tolist()
+            b["c_w_id"] = self.number(sp.starting_warehouse, sp.ending_warehouse-1, n).tolist()
+            b["c_d_id"] = self.number(1, sp.districtsPerWarehouse, n).tolist()
+        ## IF
+        b["h_amount"] = self.fixedPoint(2, constants.MIN_PAYMENT, constants.MAX_PAYMENT, n).tolist()
+
+        ## STOCK_LEVEL
+        b["threshold"] = self.number(constants.MIN_STOCK_LEVEL_THRESHOLD, constants.MAX_STOCK_LEVEL_THRESHOLD, n).tolist()
+
+        self.batch = b
+        self.offset = 0
+    ## DEF
+
+    ## ----------------------------------------------
+    ## Parameter dicts
+    ## ----------------------------------------------
+    def makeDeliveryParams(self, b, i, w_id):
+        return {
+            "w_id": w_id,
+            "o_carrier_id": b["o_carrier_id"][i],
+            "ol_delivery_d": datetime.now(),
+        }
+    ## DEF
+
+    def makeNewOrderParams(self, b, i, w_id):
+        ol_cnt = b["ol_cnt"][i]
+
+        ## Item ids must be unique within an order: redraw the duplicates
+        i_ids = [ ]
+        for i_id in b["i_ids"][i][:ol_cnt]:
+            while i_id in i_ids:
+                i_id = rand.NURand(8191, 1, self.scaleParameters.items)
+            i_ids.append(i_id)
+        ## FOR
+
+        i_w_ids = [ w_id ] * ol_cnt
+        if b["i_remote"] != None:
+            remote = b["i_remote"][i]
+            for j in range(ol_cnt):
+                if remote[j]: i_w_ids[j] = self.excluding(b["i_remote_w_id"][i][j], w_id)
+        ## IF
+
+        return {
+            "w_id": w_id,
+            "d_id": b["d_id"][i],
+            "c_id": b["c_id"][i],
+            "o_entry_d": datetime.now(),
+            "i_ids": i_ids,
+            "i_w_ids": i_w_ids,
+            "i_qtys": b["i_qtys"][i][:ol_cnt],
+        }
+    ## DEF
+
+    def makeOrderStatusParams(self, b, i, w_id):
+        by_name = b["by_name"][i]
+        return {
+            "w_id": w_id,
+            "d_id": b["d_id"][i],
+            "c_id": None if by_name else b["c_id"][i],
+            "c_last": b["c_last"][i] if by_name else None,
+        }
+    ## DEF
+
+    def makePaymentParams(self, b, i, w_id):
+        d_id = b["d_id"][i]
+        by_name = b["by_name"][i]
+        if b["remote"] != None and b["remote"][i]:
+            c_w_id = self.excluding(b["c_w_id"][i], w_id)
+            c_d_id = b["c_d_id"][i]
+        else:
+            c_w_id = w_id
+            c_d_id = d_id
+        return {
+            "w_id": w_id,
+            "d_id": d_id,
+            "h_amount": b["h_amount"][i],
+            "c_w_id": c_w_id,
+            "c_d_id": c_d_id,
+            "c_id": None if by_name else b["c_id"][i],
+            "c_last": b["c_last"][i] if by_name else None,
+            "h_date": datetime.now(),
+        }
+    ## DEF
+
+    def makeStockLevelParams(self, b, i, w_id, d_id):
+        return {
+            "w_id": w_id,
+            "d_id": d_id,
+            "threshold": b["threshold"][i],
+        }
+    ## DEF
+
+    ## ----------------------------------------------
+    ## Remote warehouses
+    ## ----------------------------------------------
+    def excluding(self, num, excluding):
+        """Shift a number drawn from [minimum, maximum-1] past excluding"""
+        if num >= excluding: num += 1
+        return num
+    ## DEF
+## CLASS
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import os
+import json
+import logging
+
+## ==============================================
+## Checkpoint
+## ==============================================
+class Checkpoint:
+    """
+        Append-only record of the work units that have been loaded, so that a
+        load that died can be picked up with --resume. The first line holds
+        the seed and NURand constants that the load was started with, which
+        the resumed load needs to generate the same data. Every other line is
+        a unit, e.g. "DISTRICT 3 7", written once the driver has committed it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.metadata = None
+        self.done = set()
+        self.fd = None
+    ## DEF
+
+    def create(self, metadata):
+        """Start a new checkpoint, throwing away the old one"""
+        with open(self.path, "w") as fd:
+            fd.write("# %s\n" % json.dumps(metadata))
+        self.metadata = metadata
+        self.done = set()
+    ## DEF
+
+    def read(self):
+        with open(self.path) as fd:
+            lines = fd.read().split("\n")
+        assert lines[0].startswith("# "), "'%s' is not a load checkpoint" % self.path
+        self.metadata = json.loads(lines[0][2:])
+
+        ## The last line is empty, or cut short if we died while writing it
+        for line in lines[1:-1]:
+            self.done.add(parseUnit(line))
+        logging.debug("Read %d finished work units from '%s'" % (len(self.done), self.path))
+        return self
+    ## DEF
+
+    def isDone(self, unit):
+        return tuple(unit) in self.done
+    ## DEF
+
+    def record(self, unit):
+        """Append a finished unit. Every process opens the file for itself, and
+        a single short write in append mode does not interleave with theirs."""
+        if self.fd == None: self.fd = open(self.path, "a")
+        self.fd.write(formatUnit(unit) + "\n")
+        self.fd.flush()
+        os.fsync(self.fd.fileno())
+        self.done.add(tuple(unit))
+    ## DEF
+## CLASS
+
+def formatUnit(unit):
+    return " ".join(map(str, unit))
+## DEF
+
+def parseUnit(line):
+    fields = line.split()
+    return tuple([ fields[0] ] + map(int, fields[1:]))
+## DEF
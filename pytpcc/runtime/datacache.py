@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import os
+import time
+import json
+import mmap
+import struct
+import marshal
+from datetime import datetime
+
+from util import *
+from loader import Loader, TupleBuffer
+
+## Every segment file starts with this, followed by blocks of
+## [4-byte length][marshal of (tableName, dateColumns, tuples)]
+SEGMENT_MAGIC = "TPCCSEG1"
+BLOCK_HEADER = struct.Struct("<I")
+METADATA_FILE = "dataset.json"
+FORMAT_VERSION = 1
+## Seed of the datasets that generate.py writes when none is given
+DEFAULT_SEED = 0
+
+## ==============================================
+## cachePath
+## ==============================================
+def cachePath(root, warehouses, scalefactor, seed):
+    """Return the directory of the dataset for the given parameters"""
+    return os.path.join(root, "w%d-sf%g-seed%d" % (warehouses, scalefactor, seed))
+## DEF
+
+## ==============================================
+## segmentPath
+## ==============================================
+def segmentPath(path, unit):
+    """Return the segment file of a work unit, see loader.makeWorkUnits().
+    The segments of each warehouse are kept in their own directory."""
+    kind = unit[0]
+    if kind == "ITEM":
+        return os.path.join(path, "ITEM-%d.seg" % unit[1])
+    elif kind == "WAREHOUSE":
+        return os.path.join(path, str(unit[1]), "WAREHOUSE.seg")
+    elif kind == "STOCK":
+        return os.path.join(path, str(unit[1]), "STOCK-%d.seg" % unit[2])
+    elif kind == "DISTRICT":
+        return os.path.join(path, str(unit[1]), "DISTRICT-%d.seg" % unit[2])
+    assert False, "Unexpected work unit: %s" % (unit,)
+## DEF
+
+## ==============================================
+## writeMetadata
+## ==============================================
+def writeMetadata(path, scaleParameters, scalefactor, seed):
+    """Record what the dataset was generated with, including the NURand
+    constants that the workload has to use to find its customers and items"""
+    metadata = {
+        "format": FORMAT_VERSION,
+        "warehouses": scaleParameters.warehouses,
+        "scalefactor": scalefactor,
+        "seed": seed,
+        "items": scaleParameters.items,
+        "customers_per_district": scaleParameters.customersPerDistrict,
+        "new_orders_per_district": scaleParameters.newOrdersPerDistrict,
+        "nurand": [ rand.nurandVar.cLast, rand.nurandVar.cId, rand.nurandVar.orderLineItemId ],
+    }
+    with open(os.path.join(path, METADATA_FILE), "w") as fd:
+        json.dump(metadata, fd, indent=2)
+## DEF
+
+## ==============================================
+## readMetadata
+## ==============================================
+def readMetadata(path):
+    with open(os.path.join(path, METADATA_FILE)) as fd:
+        metadata = json.load(fd)
+    assert metadata["format"] == FORMAT_VERSION, "Unsupported dataset format %s in '%s'" % (metadata["format"], path)
+    return metadata
+## DEF
+
+## ==============================================
+## SegmentWriter
+## ==============================================
+class SegmentWriter:
+    """
+        Stands in for a driver while a Loader generates the data, and writes
+        every batch that it is handed into the segment file of the current
+        work unit. A segment only appears under its final name once it is
+        complete.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+        self.tmp = None
+    ## DEF
+    
+    def startUnit(self, unit):
+        target = segmentPath(self.path, unit)
+        if not os.path.exists(os.path.dirname(target)):
+            try:
+                os.makedirs(os.path.dirname(target))
+            except OSError:
+                ## Another generator created it first
+                pass
+        ## IF
+        self.target = target
+        self.tmp = "%s.%d.tmp" % (target, os.getpid())
+        self.fd = open(self.tmp, "wb")
+        self.fd.write(SEGMENT_MAGIC)
+    ## DEF
+    
+    def finishUnit(self):
+        self.fd.close()
+        os.rename(self.tmp, self.target)
+        self.fd = None
+    ## DEF
+    
+    def loadWholeDistricts(self):
+        return False
+    
+    def loadTuples(self, tableName, tuples):
+        if len(tuples) == 0: return
+        
+        ## marshal cannot store datetimes, so the columns that have them are
+        ## turned into timestamps. A column is checked at its first non-null value.
+        dateColumns = [ ]
+        for i in range(len(tuples[0])):
+            for t in tuples:
+                if t[i] != None:
+                    if isinstance(t[i], datetime): dateColumns.append(i)
+                    break
+            ## FOR
+        ## FOR
+        for i in dateColumns:
+            for t in tuples:
+                if t[i] != None: t[i] = time.mktime(t[i].timetuple()) + t[i].microsecond / 1000000.0
+        ## FOR
+        
+        data = marshal.dumps((tableName, dateColumns, tuples), 2)
+        self.fd.write(BLOCK_HEADER.pack(len(data)))
+        self.fd.write(data)
+    ## DEF
+    
+    def loadFinishItem(self):
+        return None
+    
+    def loadFinishWarehouse(self, w_id):
+        return None
+    
+    def loadFinishDistrict(self, w_id, d_id):
+        return None
+## CLASS
+
+## ==============================================
+## readSegment
+## ==============================================
+def readSegment(path):
+    """Memory-map a segment file and yield its (tableName, tuples) blocks"""
+    with open(path, "rb") as fd:
+        m = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        assert m[:len(SEGMENT_MAGIC)] == SEGMENT_MAGIC, "'%s' is not a segment file" % path
+        offset = len(SEGMENT_MAGIC)
+        dates = { }
+        while offset < len(m):
+            (length, ) = BLOCK_HEADER.unpack_from(m, offset)
+            offset += BLOCK_HEADER.size
+            tableName, dateColumns, tuples = marshal.loads(m[offset:offset+length])
+            offset += length
+            
+            ## The rows of a batch share very few distinct timestamps
+            for i in dateColumns:
+                for t in tuples:
+                    ts = t[i]
+                    if ts == None: continue
+                    if not ts in dates: dates[ts] = datetime.fromtimestamp(ts)
+                    t[i] = dates[ts]
+            ## FOR
+            yield (tableName, tuples)
+        ## WHILE
+    finally:
+        m.close()
+## DEF
+
+## ==============================================
+## SegmentLoader
+## ==============================================
+class SegmentLoader(Loader):
+    """
+        Loads the work units from the segment files of a dataset generated
+        with generate.py, instead of generating them. Each block is handed to
+        the driver as it is read, so only one block is in memory at a time.
+    """
+    
+    def __init__(self, handle, path, scaleParameters, w_ids, needLoadItems):
+        Loader.__init__(self, handle, scaleParameters, w_ids, needLoadItems)
+        self.path = path
+        metadata = readMetadata(path)
+        assert metadata["warehouses"] >= scaleParameters.ending_warehouse, \
+            "The dataset in '%s' only has %d warehouses" % (path, metadata["warehouses"])
+        assert metadata["items"] == scaleParameters.items and \
+               metadata["customers_per_district"] == scaleParameters.customersPerDistrict and \
+               metadata["new_orders_per_district"] == scaleParameters.newOrdersPerDistrict, \
+            "The dataset in '%s' was generated with scale factor %g" % (path, metadata["scalefactor"])
+    ## DEF
+    
+    def loadUnit(self, unit):
+        ## Drivers that want whole districts get every table of the segment in one go
+        buf = None
+        if unit[0] == "DISTRICT" and self.handle.loadWholeDistricts():
+            buf = TupleBuffer(self.handle)
+        
+        for tableName, tuples in readSegment(segmentPath(self.path, unit)):
+            if buf != None:
+                for t in tuples: buf.add(tableName, t)
+            else:
+                self.handle.loadTuples(tableName, tuples)
+        ## FOR
+        if buf != None: buf.flush()
+        if unit[0] == "DISTRICT": self.handle.loadFinishDistrict(unit[1], unit[2])
+    ## DEF
+## CLASS
+
+## ==============================================
+## setNURand
+## ==============================================
+def setNURand(path):
+    """Use the NURand constants that the dataset was generated with"""
+    c = readMetadata(path)["nurand"]
+    rand.setNURand(nurand.NURandC(c[0], c[1], c[2]))
+## DEF
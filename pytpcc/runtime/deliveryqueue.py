@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import time
+import logging
+import threading
+import Queue
+
+import constants
+from util.histogram import Histogram
+from executor import executeWithRetry
+
+## ==============================================
+## DeliveryQueue
+## ==============================================
+class DeliveryQueue:
+    """
+        Deferred execution of DELIVERY transactions. See TPC-C 2.7.2 (page 39).
+        Terminals enqueue the request and return immediately. A pool of
+        background workers, each with its own driver connection, drains the
+        queue and records how long every request waited and how long it took
+        until the delivery was completed. Like any other transaction, a
+        delivery is only recorded if it was queued inside the measurement
+        interval of the Results it was queued for. Failed deliveries are
+        rolled back and retried as the retry policy allows, like the
+        transactions of the terminals.
+    """
+
+    def __init__(self, makeDriver, num_workers, retry_policy = None):
+        assert num_workers > 0
+        self.retry_policy = retry_policy
+        self.error = None
+        self.queue = Queue.Queue()
+        self.workers = [ ]
+        self.stats = [ ]
+        self.drivers = [ ]
+        for i in range(num_workers):
+            stats = { "count": 0, "errors": 0, "queue_time": 0.0, "completion_time": 0.0, "histogram": Histogram() }
+            t = threading.Thread(target=self.run, args=(makeDriver, stats))
+            t.daemon = True
+            t.start()
+            self.workers.append(t)
+            self.stats.append(stats)
+        ## FOR
+    ## DEF
+
+    def enqueue(self, params, r):
+        if self.error != None: raise self.error
+        self.queue.put((params, time.time(), r))
+    ## DEF
+
+    def finish(self, r):
+        """Wait until every queued delivery is done and record the times in the given Results"""
+        logging.debug("Waiting for %d queued deliveries" % self.queue.qsize())
+        for t in self.workers:
+            self.queue.put(None)
+        for t in self.workers:
+            t.join()
+        if self.error != None: raise self.error
+        for stats in self.stats:
+            r.recordDeferred(stats["count"], stats["errors"], stats["queue_time"], stats["completion_time"], stats["histogram"])
+        for driver in self.drivers:
+            r.recordStatements(driver.getStatementStats())
+    ## DEF
+
+    def run(self, makeDriver, stats):
+        ## Without a driver this worker cannot run any delivery: the error is
+        ## raised by the next enqueue() or by finish(), so the run fails
+        try:
+            driver = makeDriver()
+            driver.executeStart()
+        except Exception, ex:
+            logging.error("Failed to create a driver for the deferred deliveries: %s" % ex)
+            self.error = ex
+            return
+        self.drivers.append(driver)
+        while True:
+            item = self.queue.get()
+            if item == None: break
+            params, queued, r = item
+
+            started = time.time()
+            try:
+                val, error, retries = executeWithRetry(driver, constants.TransactionTypes.DELIVERY, params, self.retry_policy)
+            except Exception, ex:
+                ## e.g. the rollback failed on a dead connection
+                error = ex
+            if error != None:
+                logging.warn("Failed to execute deferred DELIVERY: %s" % error)
+                if r.isMeasured(queued): stats["errors"] += 1
+                continue
+            completed = time.time()
+            if not r.isMeasured(queued): continue
+
+            stats["count"] += 1
+            stats["queue_time"] += started - queued
+            stats["completion_time"] += completed - queued
+            stats["histogram"].record(completed - queued)
+        ## WHILE
+        driver.executeFinish()
+    ## DEF
+## CLASS
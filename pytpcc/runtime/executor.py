@@ -39,39 +39,104 @@ from datetime import datetime
 from pprint import pprint,pformat
 
 import constants
+import batchgen
+import txnlog
 from util import *
 
+ARRIVAL_SCHEDULES = [ "fixed", "poisson" ]
 
 class Executor:
     
-    def __init__(self, driver, scaleParameters, txnprob, stop_on_error = False):
+    def __init__(self, driver, scaleParameters, txnprob, stop_on_error = False, batch_size = 0,
+                 rate = None, arrival = "fixed", terminal_id = None, delivery_queue = None,
+                 record = None, replay = None, use_deck = False,
+                 warmup = 0, cooldown = 0, steady_state = False, timeseries = None, interval = None,
+                 progress = None, progress_slot = 0, retry_policy = None):
         self.driver = driver
         self.scaleParameters = scaleParameters
         self.stop_on_error = stop_on_error
+        self.rate = rate
+        self.arrival = arrival
+        self.delivery_queue = delivery_queue
+        self.warmup = warmup
+        self.cooldown = cooldown
+        self.steady_state = steady_state
+        ## A time series with 'interval' second buckets is kept if interval is
+        ## set, and streamed to the 'timeseries' path if that is set as well
+        self.timeseries = timeseries
+        self.interval = interval
+        self.progress = progress
+        self.retry_policy = retry_policy
+        self.progress_slot = progress_slot
+        self.next_publish = 0
+        assert self.arrival in ARRIVAL_SCHEDULES, "Invalid arrival schedule '%s'" % self.arrival
         self.txnprob = [ sum(txnprob[:i+1]) for i in range(len(txnprob)) ]
+        self.deck = deck.Deck(txnprob) if use_deck else None
+
+        ## Terminals that are bound to a home (w_id, d_id), see makeHome()
+        self.home = None
+        if terminal_id != None: self.home = makeHome(self.scaleParameters, terminal_id)
+
+        ## Record the transaction parameter stream to a file, or replay it from one
+        self.recorder = None
+        self.replay = None
+        if record != None: self.recorder = txnlog.TxnLogWriter(record)
+        if replay != None: self.replay = txnlog.TxnLogReader(replay)
+        
+        ## Pre-generate the transaction parameters in batches with NumPy
+        self.generator = None
+        if batch_size > 0:
+            self.generator = batchgen.BatchGenerator(self.scaleParameters, self.txnprob, batch_size, self.deck)
     ## DEF
     
     def execute(self, duration):
-        r = results.Results()
-        assert r
+        r = self.makeResults()
         logging.info("Executing benchmark for %d seconds" % duration)
-        start = r.startBenchmark()
+        window = self.makeWindow(r, duration)
+        start = window.start()
         debug = logging.getLogger().isEnabledFor(logging.DEBUG)
 
-        while (time.time() - start) <= duration:
+        ## Open-loop mode: every transaction has an intended start time on the
+        ## arrival schedule. If we fall behind we do not wait, but the time spent
+        ## queued is still charged to the transaction's response time.
+        intended = None
+        if self.rate: intended = start
+
+        while True:
+            now = time.time()
+            if not window.update(now): break
+            if self.progress != None and now >= self.next_publish: self.publish(r, now)
+            if intended != None:
+                intended += self.nextInterarrival()
+                ## Wait until the transaction is due, but not past the end of the
+                ## run, and only then move the window: it must never be opened or
+                ## closed at a time that has not come yet
+                delay = intended - time.time()
+                if window.end != None: delay = min(delay, window.end + window.cooldown - time.time())
+                if delay > 0: time.sleep(delay)
+                if not window.update(time.time()): break
+            ## IF
+            
             txn, params = self.doOne()
-            txn_id = r.startTransaction(txn)
+            if txn == None: break
+            txn_id = r.startTransaction(txn, intended)
+            
+            ## DELIVERY is deferred: the terminal only waits for it to be queued
+            if txn == constants.TransactionTypes.DELIVERY and self.delivery_queue != None:
+                self.delivery_queue.enqueue(params, r)
+                r.stopTransaction(txn_id)
+                continue
             
             if debug: logging.debug("Executing '%s' transaction" % txn)
             try:
-                val = self.driver.executeTransaction(txn, params)
+                val, error, retries = executeWithRetry(self.driver, txn, params, self.retry_policy)
             except KeyboardInterrupt:
                 return -1
-            except (Exception, AssertionError), ex:
-                logging.warn("Failed to execute Transaction '%s': %s" % (txn, ex))
-                if debug: traceback.print_exc(file=sys.stdout)
-                if self.stop_on_error: raise
-                r.abortTransaction(txn_id)
+            if retries > 0: r.retryTransaction(txn_id, retries)
+            if error != None:
+                logging.warn("Failed to execute Transaction '%s': %s" % (txn, error))
+                if self.stop_on_error: raise error
+                r.abortTransaction(txn_id, error)
                 continue
 
             #if debug: logging.debug("%s\nParameters:\n%s\nResult:\n%s" % (txn, pformat(params), pformat(val)))
@@ -80,16 +145,70 @@ class Executor:
         ## WHILE
             
         r.stopBenchmark()
+        self.finish(r)
+        if self.progress != None: self.publish(r, r.stop)
         return (r)
     ## DEF
     
+    def makeResults(self):
+        r = results.Results()
+        assert r
+        if self.interval != None: r.enableTimeSeries(self.timeseries, self.interval)
+        return r
+    ## DEF
+    
+    def publish(self, r, now):
+        """Copy the counters to our slot on the live progress board"""
+        self.progress.publish(self.progress_slot, r)
+        self.next_publish = now + self.progress.interval / 2.0
+    ## DEF
+    
+    def makeWindow(self, r, duration):
+        """Return the MeasurementWindow for a run of the given duration"""
+        if self.warmup > 0 or self.cooldown > 0:
+            logging.info("Warm-up: %d seconds%s, cool-down: %d seconds" % \
+                         (self.warmup, " (or until steady state)" if self.steady_state else "", self.cooldown))
+        return results.MeasurementWindow(r, duration, self.warmup, self.cooldown, self.steady_state)
+    ## DEF
+    
+    def finish(self, r):
+        """Wait for the deferred work, collect the statement timings and close the transaction logs"""
+        if self.delivery_queue != None: self.delivery_queue.finish(r)
+        r.recordStatements(self.driver.getStatementStats())
+        if self.recorder != None: self.recorder.close()
+        if self.replay != None: self.replay.close()
+    ## DEF
+    
+    def nextInterarrival(self):
+        """Return the time in seconds until the next scheduled transaction in open-loop mode"""
+        if self.arrival == "poisson":
+            return random.expovariate(self.rate)
+        return 1.0 / self.rate
+    ## DEF
+    
     def doOne(self):
-        """Selects and executes a transaction at random. The number of new order transactions executed per minute is the official "tpmC" metric. See TPC-C 5.4.2 (page 71)."""
+        """Selects and executes a transaction at random. The number of new order transactions executed per minute is the official "tpmC" metric. See TPC-C 5.4.2 (page 71).
+        When replaying a transaction log, this returns (None, None) once the log is exhausted."""
+        if self.replay != None:
+            return self.replay.next()
         
-        ## This is not strictly accurate: The requirement is for certain
-        ## *minimum* percentages to be maintained. This is close to the right
+        if self.generator != None:
+            txn, params = self.generator.next(self.home)
+        else:
+            txn, params = self.selectTransaction()
+        
+        if self.recorder != None: self.recorder.write(txn, params)
+        return (txn, params)
+    ## DEF
+    
+    def selectTransaction(self):
+        ## Without the deck this is not strictly accurate: The requirement is for
+        ## certain *minimum* percentages to be maintained. This is close to the right
         ## thing, but not precisely correct. See TPC-C 5.2.4 (page 68).
-        x = rand.number(1, self.txnprob[4])
+        if self.deck != None:
+            x = self.txnprob[self.deck.draw()]
+        else:
+            x = rand.number(1, self.txnprob[4])
         params = None
         txn = None
         if x <= self.txnprob[0]: ## 4%
@@ -223,12 +342,17 @@ class Executor:
     def generateStockLevelParams(self):
         """Returns parameters for STOCK_LEVEL"""
         w_id = self.makeWarehouseId()
-        d_id = self.makeDistrictId()
+        ## Each terminal always checks the stock level of the same district (TPC-C 2.8.1.2)
+        if self.home != None:
+            d_id = self.home[1]
+        else:
+            d_id = self.makeDistrictId()
         threshold = rand.number(constants.MIN_STOCK_LEVEL_THRESHOLD, constants.MAX_STOCK_LEVEL_THRESHOLD)
         return makeParameterDict(locals(), "w_id", "d_id", "threshold")
     ## DEF
 
     def makeWarehouseId(self):
+        if self.home != None: return self.home[0]
         w_id = rand.number(self.scaleParameters.starting_warehouse, self.scaleParameters.ending_warehouse)
         assert(w_id >= self.scaleParameters.starting_warehouse), "Invalid W_ID: %d" % w_id
         assert(w_id <= self.scaleParameters.ending_warehouse), "Invalid W_ID: %d" % w_id
@@ -248,6 +372,36 @@ class Executor:
     ## DEF
 ## CLASS
 
+def makeHome(scaleParameters, terminal_id):
+    """Return the home (w_id, d_id) of the given terminal. Terminals are spread
+    over all of the warehouses first, so that every warehouse gets a terminal
+    before any warehouse gets a second one. See TPC-C 2.4.1.1 and 2.8.1.2."""
+    w_id = scaleParameters.starting_warehouse + (terminal_id % scaleParameters.warehouses)
+    d_id = (terminal_id / scaleParameters.warehouses) % scaleParameters.districtsPerWarehouse + 1
+    return (w_id, d_id)
+## DEF
+
+def executeWithRetry(driver, txn, params, policy = None):
+    """Execute a transaction, retrying it with the same parameters as long as the
+    retry policy allows. Returns (result, error, retries) where error is the exception
+    that finally aborted the transaction, or None if it committed."""
+    retries = 0
+    while True:
+        try:
+            return (driver.executeTransaction(txn, params), None, retries)
+        except KeyboardInterrupt:
+            raise
+        except (Exception, AssertionError), ex:
+            driver.rollbackTransaction()
+            if policy == None or not policy.shouldRetry(driver, ex, retries):
+                if logging.getLogger().isEnabledFor(logging.DEBUG): traceback.print_exc(file=sys.stdout)
+                return (None, ex, retries)
+            logging.debug("Retrying '%s' transaction after: %s" % (txn, ex))
+            time.sleep(policy.getDelay(retries))
+            retries += 1
+    ## WHILE
+## DEF
+
 def makeParameterDict(values, *args):
     return dict(map(lambda x: (x, values[x]), args))
 ## DEF
@@ -31,159 +31,281 @@
 
 import os
 import sys
+import zlib
+import random
 
 import logging
 from datetime import datetime
 from random import shuffle
 from pprint import pprint,pformat
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 import constants
 from util import *
 
+## The ITEM and STOCK tables are loaded in chunks of this many rows
+CHUNK_SIZE = 10000
+
+## ==============================================
+## makeWorkUnits
+## ==============================================
+def makeWorkUnits(scaleParameters, w_ids, needLoadItems, chunk_size = CHUNK_SIZE):
+    """
+        Split the data of the given warehouses into units that can be loaded
+        independently of each other, in any order and by any process:
+            ("ITEM", first i_id, last i_id)
+            ("WAREHOUSE", w_id)
+            ("STOCK", w_id, first i_id, last i_id)
+            ("DISTRICT", w_id, d_id)  -- the district with its customers, history and orders
+    """
+    units = [ ]
+    items = scaleParameters.items
+    if needLoadItems:
+        for lo in range(1, items+1, chunk_size):
+            units.append(("ITEM", lo, min(lo + chunk_size - 1, items)))
+    for w_id in w_ids:
+        units.append(("WAREHOUSE", w_id))
+        for lo in range(1, items+1, chunk_size):
+            units.append(("STOCK", w_id, lo, min(lo + chunk_size - 1, items)))
+        for d_id in range(1, scaleParameters.districtsPerWarehouse+1):
+            units.append(("DISTRICT", w_id, d_id))
+    ## FOR
+    return units
+## DEF
+
+## ==============================================
+## TupleBuffer
+## ==============================================
+class TupleBuffer:
+    """
+        Collects tuples per table and hands them to the driver once any table
+        has batch_size of them. All of the tables are flushed together, in the
+        order in which they were first added, so a driver never sees a row
+        before the rows that it refers to. Without a batch_size, the tuples are
+        only passed on when flush() is called.
+    """
+    
+    def __init__(self, handle, batch_size = None):
+        self.handle = handle
+        self.batch_size = batch_size
+        self.tables = [ ]
+        self.tuples = { }
+    ## DEF
+    
+    def add(self, tableName, t):
+        if not tableName in self.tuples:
+            self.tables.append(tableName)
+            self.tuples[tableName] = [ ]
+        tuples = self.tuples[tableName]
+        tuples.append(t)
+        if self.batch_size != None and len(tuples) >= self.batch_size: self.flush()
+    ## DEF
+    
+    def flush(self):
+        for tableName in self.tables:
+            if len(self.tuples[tableName]) > 0:
+                self.handle.loadTuples(tableName, self.tuples[tableName])
+                self.tuples[tableName] = [ ]
+        ## FOR
+    ## DEF
+## CLASS
+
 class Loader:
     
-    def __init__(self, handle, scaleParameters, w_ids, needLoadItems):
+    def __init__(self, handle, scaleParameters, w_ids, needLoadItems, seed = None):
         self.handle = handle
         self.scaleParameters = scaleParameters
         self.w_ids = w_ids
         self.needLoadItems = needLoadItems
         self.batch_size = 2500
+        self.seed = seed
+        self.checkpoint = None
+        
+        ## Generate whole batches of rows with NumPy if we can
+        self.columns = randvec.RandomColumns() if numpy != None else None
         
     ## ==============================================
     ## execute
     ## ==============================================
     def execute(self):
-        
-        ## Item Table
-        if self.needLoadItems:
-            logging.debug("Loading ITEM table")
-            self.loadItems()
-            self.handle.loadFinishItem()
-            
-        ## Then create the warehouse-specific tuples
-        for w_id in self.w_ids:
-            self.loadWarehouse(w_id)
-        for w_id in self.w_ids:
-            self.loadDistricts(w_id)
-        for w_id in self.w_ids:
-            self.handle.loadFinishWarehouse(w_id)
-        ## FOR
-        
+        self.executeUnits(makeWorkUnits(self.scaleParameters, self.w_ids, self.needLoadItems))
         return (None)
 
+    ## ==============================================
+    ## executeQueue
+    ## ==============================================
+    def executeQueue(self, queue):
+        """Load the units of a shared queue until we take a None from it"""
+        self.executeUnits(iter(queue.get, None))
+
+    ## ==============================================
+    ## executeUnits
+    ## ==============================================
+    def executeUnits(self, units):
+        """Load the given work units, see makeWorkUnits(). The driver's loadFinishItem
+        and loadFinishWarehouse callbacks are invoked at the end for the data that this
+        loader touched, since other loaders may be working on the same tables.
+        The units that the checkpoint has as done are skipped."""
+        loadedItems = False
+        w_ids = [ ]
+        for unit in units:
+            if self.checkpoint != None and self.checkpoint.isDone(unit): continue
+            logging.debug("LOAD - %s" % (unit,))
+            self.loadUnit(unit)
+            self.handle.loadCommit()
+            if self.checkpoint != None: self.checkpoint.record(unit)
+            if unit[0] == "ITEM":
+                loadedItems = True
+            elif not unit[1] in w_ids:
+                w_ids.append(unit[1])
+        ## FOR
+        if loadedItems: self.handle.loadFinishItem()
+        for w_id in w_ids:
+            self.handle.loadFinishWarehouse(w_id)
+    
+    ## ==============================================
+    ## loadUnit
+    ## ==============================================
+    def loadUnit(self, unit):
+        if self.seed != None: self.seedUnit(unit)
+        kind = unit[0]
+        if kind == "ITEM":
+            self.loadItems(unit[1], unit[2])
+        elif kind == "WAREHOUSE":
+            self.handle.loadTuples(constants.TABLENAME_WAREHOUSE, [ self.generateWarehouse(unit[1]) ])
+        elif kind == "STOCK":
+            self.loadStock(unit[1], unit[2], unit[3])
+        elif kind == "DISTRICT":
+            self.loadDistrict(unit[1], unit[2])
+        else:
+            assert False, "Unexpected work unit: %s" % (unit,)
+    ## DEF
+
+    ## ==============================================
+    ## seedUnit
+    ## ==============================================
+    def seedUnit(self, unit):
+        """Seed the random generators from the unit, so that it always gets the
+        same data no matter which process loads it or in what order"""
+        seed = zlib.crc32(repr((self.seed, ) + tuple(unit))) & 0xffffffff
+        random.seed(seed)
+        if self.columns != None: self.columns.seed(seed)
+    ## DEF
+
     ## ==============================================
     ## loadItems
     ## ==============================================
-    def loadItems(self):
+    def loadItems(self, first = 1, last = None):
+        if last == None: last = self.scaleParameters.items
+        
         ## Select 10% of the rows to be marked "original"
-        originalRows = rand.selectUniqueIds(self.scaleParameters.items / 10, 1, self.scaleParameters.items)
+        originalRows = rand.selectUniqueIds((last - first + 1) / 10, first, last)
         
         ## Load all of the items
-        tuples = [ ]
-        total_tuples = 0
-        for i in range(1, self.scaleParameters.items+1):
-            original = (i in originalRows)
-            tuples.append(self.generateItem(i, original))
-            total_tuples += 1
-            if len(tuples) == self.batch_size:
-                logging.debug("LOAD - %s: %5d / %d" % (constants.TABLENAME_ITEM, total_tuples, self.scaleParameters.items))
-                self.handle.loadTuples(constants.TABLENAME_ITEM, tuples)
-                tuples = [ ]
+        for lo in range(first, last+1, self.batch_size):
+            i_ids = range(lo, min(lo + self.batch_size - 1, last) + 1)
+            logging.debug("LOAD - %s: %5d / %d" % (constants.TABLENAME_ITEM, i_ids[-1], self.scaleParameters.items))
+            self.handle.loadTuples(constants.TABLENAME_ITEM, self.generateItemBatch(i_ids, originalRows))
         ## FOR
-        if len(tuples) > 0:
-            logging.debug("LOAD - %s: %5d / %d" % (constants.TABLENAME_ITEM, total_tuples, self.scaleParameters.items))
-            self.handle.loadTuples(constants.TABLENAME_ITEM, tuples)
     ## DEF
 
     ## ==============================================
-    ## loadWarehouse
+    ## loadStock
     ## ==============================================
-    def loadWarehouse(self, w_id):
-        logging.debug("LOAD - %s: %d / %d" % (constants.TABLENAME_WAREHOUSE, w_id, len(self.w_ids)))
-        
-        ## WAREHOUSE
-        w_tuples = [ self.generateWarehouse(w_id) ]
-        self.handle.loadTuples(constants.TABLENAME_WAREHOUSE, w_tuples)
+    def loadStock(self, w_id, first = 1, last = None):
+        if last == None: last = self.scaleParameters.items
 
         ## Select 10% of the stock to be marked "original"
-        s_tuples = [ ]
-        selectedRows = rand.selectUniqueIds(self.scaleParameters.items / 10, 1, self.scaleParameters.items)
-        total_tuples = 0
-        for i_id in range(1, self.scaleParameters.items+1):
-            original = (i_id in selectedRows)
-            s_tuples.append(self.generateStock(w_id, i_id, original))
-            if len(s_tuples) >= self.batch_size:
-                logging.debug("LOAD - %s [W_ID=%d]: %5d / %d" % (constants.TABLENAME_STOCK, w_id, total_tuples, self.scaleParameters.items))
-                self.handle.loadTuples(constants.TABLENAME_STOCK, s_tuples)
-                s_tuples = [ ]
-            total_tuples += 1
+        selectedRows = rand.selectUniqueIds((last - first + 1) / 10, first, last)
+        for lo in range(first, last+1, self.batch_size):
+            i_ids = range(lo, min(lo + self.batch_size - 1, last) + 1)
+            logging.debug("LOAD - %s [W_ID=%d]: %5d / %d" % (constants.TABLENAME_STOCK, w_id, i_ids[-1], self.scaleParameters.items))
+            self.handle.loadTuples(constants.TABLENAME_STOCK, self.generateStockBatch(w_id, i_ids, selectedRows))
         ## FOR
-        if len(s_tuples) > 0:
-            logging.debug("LOAD - %s [W_ID=%d]: %5d / %d" % (constants.TABLENAME_STOCK, w_id, total_tuples, self.scaleParameters.items))
-            self.handle.loadTuples(constants.TABLENAME_STOCK, s_tuples)
+    ## DEF
 
     ## ==============================================
-    ## loadDistricts
+    ## loadDistrict
     ## ==============================================
-    def loadDistricts(self, w_id):
-        logging.debug("LOAD - %s: %d / %d" % (constants.TABLENAME_WAREHOUSE, w_id, len(self.w_ids)))
-  
-        ## DISTRICT
-        d_tuples = [ ]
-        for d_id in range(1, self.scaleParameters.districtsPerWarehouse+1):
-            d_next_o_id = self.scaleParameters.customersPerDistrict + 1
-            d_tuples = [ self.generateDistrict(w_id, d_id, d_next_o_id) ]
-            
-            c_tuples = [ ]
-            h_tuples = [ ]
-            
-            ## Select 10% of the customers to have bad credit
-            selectedRows = rand.selectUniqueIds(self.scaleParameters.customersPerDistrict / 10, 1, self.scaleParameters.customersPerDistrict)
-            
-            ## TPC-C 4.3.3.1. says that o_c_id should be a permutation of [1, 3000]. But since it
-            ## is a c_id field, it seems to make sense to have it be a permutation of the
-            ## customers. For the "real" thing this will be equivalent
-            cIdPermutation = [ ]
-
-            for c_id in range(1, self.scaleParameters.customersPerDistrict+1):
-                badCredit = (c_id in selectedRows)
-                c_tuples.append(self.generateCustomer(w_id, d_id, c_id, badCredit, True))
-                h_tuples.append(self.generateHistory(w_id, d_id, c_id))
-                cIdPermutation.append(c_id)
+    def loadDistrict(self, w_id, d_id):
+        """Stream the tuples of a district to the driver in batches of batch_size,
+        unless the driver asks for whole districts"""
+        batch_size = None if self.handle.loadWholeDistricts() else self.batch_size
+        buf = TupleBuffer(self.handle, batch_size)
+        
+        d_next_o_id = self.scaleParameters.customersPerDistrict + 1
+        buf.add(constants.TABLENAME_DISTRICT, self.generateDistrict(w_id, d_id, d_next_o_id))
+        
+        ## TPC-C 4.3.3.1. says that o_c_id should be a permutation of [1, 3000]. But since it
+        ## is a c_id field, it seems to make sense to have it be a permutation of the
+        ## customers. For the "real" thing this will be equivalent
+        cIdPermutation = range(1, self.scaleParameters.customersPerDistrict+1)
+        shuffle(cIdPermutation)
+        
+        ## All of the CUSTOMER rows go out before any ORDERS that refer to them
+        for tableName, t in self.generateCustomers(w_id, d_id):
+            buf.add(tableName, t)
+        buf.flush()
+        for tableName, t in self.generateOrders(w_id, d_id, cIdPermutation):
+            buf.add(tableName, t)
+        buf.flush()
+        self.handle.loadFinishDistrict(w_id, d_id)
+    ## DEF
+    
+    ## ==============================================
+    ## generateCustomers
+    ## ==============================================
+    def generateCustomers(self, w_id, d_id):
+        """Yield the (tableName, tuple) CUSTOMER and HISTORY rows of a district"""
+        ## Select 10% of the customers to have bad credit
+        customers = self.scaleParameters.customersPerDistrict
+        selectedRows = rand.selectUniqueIds(customers / 10, 1, customers)
+        
+        for lo in range(1, customers+1, self.batch_size):
+            c_ids = range(lo, min(lo + self.batch_size - 1, customers) + 1)
+            c_tuples = self.generateCustomerBatch(w_id, d_id, c_ids, selectedRows)
+            h_tuples = self.generateHistoryBatch(w_id, d_id, c_ids)
+            for i in xrange(len(c_ids)):
+                yield (constants.TABLENAME_CUSTOMER, c_tuples[i])
+                yield (constants.TABLENAME_HISTORY, h_tuples[i])
             ## FOR
-            assert cIdPermutation[0] == 1
-            assert cIdPermutation[self.scaleParameters.customersPerDistrict - 1] == self.scaleParameters.customersPerDistrict
-            shuffle(cIdPermutation)
-            
-            o_tuples = [ ]
-            ol_tuples = [ ]
-            no_tuples = [ ]
+        ## FOR
+    ## DEF
+    
+    ## ==============================================
+    ## generateOrders
+    ## ==============================================
+    def generateOrders(self, w_id, d_id, cIdPermutation):
+        """Yield the (tableName, tuple) ORDERS, ORDER_LINE and NEW_ORDER rows of a district"""
+        customers = self.scaleParameters.customersPerDistrict
+        
+        ## An order has at most MAX_OL_CNT lines, so this many orders fit in a batch
+        chunk = max(self.batch_size / constants.MAX_OL_CNT, 1)
+        for lo in range(1, customers+1, chunk):
+            o_ids = range(lo, min(lo + chunk - 1, customers) + 1)
+            o_tuples = self.generateOrderBatch(w_id, d_id, o_ids, cIdPermutation)
+            for t in o_tuples:
+                yield (constants.TABLENAME_ORDERS, t)
+            for t in self.generateOrderLineBatch(w_id, d_id, o_tuples):
+                yield (constants.TABLENAME_ORDER_LINE, t)
             
-            for o_id in range(1, self.scaleParameters.customersPerDistrict+1):
-                o_ol_cnt = rand.number(constants.MIN_OL_CNT, constants.MAX_OL_CNT)
-                
-                ## The last newOrdersPerDistrict are new orders
-                newOrder = ((self.scaleParameters.customersPerDistrict - self.scaleParameters.newOrdersPerDistrict) < o_id)
-                o_tuples.append(self.generateOrder(w_id, d_id, o_id, cIdPermutation[o_id - 1], o_ol_cnt, newOrder))
-
-                ## Generate each OrderLine for the order
-                for ol_number in range(0, o_ol_cnt):
-                    ol_tuples.append(self.generateOrderLine(w_id, d_id, o_id, ol_number, self.scaleParameters.items, newOrder))
-                ## FOR
-
-                ## This is a new order: make one for it
-                if newOrder: no_tuples.append([o_id, d_id, w_id])
+            ## Every new order gets a NEW_ORDER row
+            for o_id in o_ids:
+                if self.isNewOrder(o_id): yield (constants.TABLENAME_NEW_ORDER, [o_id, d_id, w_id])
             ## FOR
-            
-            self.handle.loadTuples(constants.TABLENAME_DISTRICT, d_tuples)
-            self.handle.loadTuples(constants.TABLENAME_CUSTOMER, c_tuples)
-            self.handle.loadTuples(constants.TABLENAME_ORDERS, o_tuples)
-            self.handle.loadTuples(constants.TABLENAME_ORDER_LINE, ol_tuples)
-            self.handle.loadTuples(constants.TABLENAME_NEW_ORDER, no_tuples)
-            self.handle.loadTuples(constants.TABLENAME_HISTORY, h_tuples)
-            self.handle.loadFinishDistrict(w_id, d_id)
         ## FOR
-        
+    ## DEF
+    
+    ## ==============================================
+    ## isNewOrder
+    ## ==============================================
+    def isNewOrder(self, o_id):
+        """The last newOrdersPerDistrict orders of a district are new orders"""
+        return ((self.scaleParameters.customersPerDistrict - self.scaleParameters.newOrdersPerDistrict) < o_id)
     ## DEF
 
     ## ==============================================
@@ -303,7 +425,7 @@ class Loader:
         s_remote_cnt = 0;
 
         s_data = rand.astring(constants.MIN_I_DATA, constants.MAX_I_DATA);
-        if original: self.fillOriginal(s_data)
+        if original: s_data = self.fillOriginal(s_data)
 
         s_dists = [ ]
         for i in range(0, constants.DISTRICTS_PER_WAREHOUSE):
@@ -383,4 +505,157 @@ class Loader:
         assert len(out) == len(data)
         return out
     ## DEF
+
+    ## ==============================================
+    ## Batch generators
+    ## ==============================================
+    ## These return the rows for a list of ids at once, drawing every random
+    ## column with a single NumPy call. Without NumPy they fall back on the
+    ## generators above, one row at a time.
+    
+    def generateItemBatch(self, i_ids, originalRows):
+        cols = self.columns
+        if cols == None:
+            return [ self.generateItem(i_id, i_id in originalRows) for i_id in i_ids ]
+        n = len(i_ids)
+        i_im_ids = cols.number(constants.MIN_IM, constants.MAX_IM, n).tolist()
+        i_names = cols.astring(constants.MIN_I_NAME, constants.MAX_I_NAME, n)
+        i_prices = cols.fixedPoint(constants.MONEY_DECIMALS, constants.MIN_PRICE, constants.MAX_PRICE, n).tolist()
+        i_data = self.fillOriginalBatch(cols.astring(constants.MIN_I_DATA, constants.MAX_I_DATA, n), i_ids, originalRows)
+        return map(list, zip(i_ids, i_im_ids, i_names, i_prices, i_data))
+    ## DEF
+    
+    def generateStockBatch(self, s_w_id, i_ids, originalRows):
+        cols = self.columns
+        if cols == None:
+            return [ self.generateStock(s_w_id, i_id, i_id in originalRows) for i_id in i_ids ]
+        n = len(i_ids)
+        s_quantities = cols.number(constants.MIN_QUANTITY, constants.MAX_QUANTITY, n).tolist()
+        s_data = self.fillOriginalBatch(cols.astring(constants.MIN_I_DATA, constants.MAX_I_DATA, n), i_ids, originalRows)
+        s_dists = [ cols.astring(constants.DIST, constants.DIST, n) for i in range(0, constants.DISTRICTS_PER_WAREHOUSE) ]
+        zeros = [ 0 ] * n
+        
+        ## s_ytd, s_order_cnt and s_remote_cnt start at zero
+        columns = [ i_ids, [ s_w_id ] * n, s_quantities ] + s_dists + [ zeros, zeros, zeros, s_data ]
+        return map(list, zip(*columns))
+    ## DEF
+    
+    def generateCustomerBatch(self, c_w_id, c_d_id, c_ids, badCreditRows):
+        cols = self.columns
+        if cols == None:
+            return [ self.generateCustomer(c_w_id, c_d_id, c_id, c_id in badCreditRows, True) for c_id in c_ids ]
+        assert 1 <= c_ids[0] and c_ids[-1] <= constants.CUSTOMERS_PER_DISTRICT
+        n = len(c_ids)
+        c_first = cols.astring(constants.MIN_FIRST, constants.MAX_FIRST, n)
+        c_last = cols.randomLastName(constants.CUSTOMERS_PER_DISTRICT, n).tolist()
+        c_phone = cols.nstring(constants.PHONE, constants.PHONE, n)
+        c_since = datetime.now()
+        c_discount = cols.fixedPoint(constants.DISCOUNT_DECIMALS, constants.MIN_DISCOUNT, constants.MAX_DISCOUNT, n).tolist()
+        c_data = cols.astring(constants.MIN_C_DATA, constants.MAX_C_DATA, n)
+        c_street1 = cols.astring(constants.MIN_STREET, constants.MAX_STREET, n)
+        c_street2 = cols.astring(constants.MIN_STREET, constants.MAX_STREET, n)
+        c_city = cols.astring(constants.MIN_CITY, constants.MAX_CITY, n)
+        c_state = cols.astring(constants.STATE, constants.STATE, n)
+        c_zip = self.generateZipBatch(n)
+        
+        tuples = [ ]
+        for i in xrange(n):
+            c_id = c_ids[i]
+            
+            ## The first 1000 customers take every last name once
+            if c_id <= 1000: c_last[i] = cols.lastNames[c_id - 1]
+            c_credit = constants.BAD_CREDIT if c_id in badCreditRows else constants.GOOD_CREDIT
+            tuples.append([ c_id, c_d_id, c_w_id, c_first[i], constants.MIDDLE, c_last[i], \
+                            c_street1[i], c_street2[i], c_city[i], c_state[i], c_zip[i], \
+                            c_phone[i], c_since, c_credit, constants.INITIAL_CREDIT_LIM, c_discount[i], constants.INITIAL_BALANCE, \
+                            constants.INITIAL_YTD_PAYMENT, constants.INITIAL_PAYMENT_CNT, constants.INITIAL_DELIVERY_CNT, c_data[i] ])
+        ## FOR
+        return tuples
+    ## DEF
+    
+    def generateHistoryBatch(self, h_c_w_id, h_c_d_id, c_ids):
+        cols = self.columns
+        if cols == None:
+            return [ self.generateHistory(h_c_w_id, h_c_d_id, c_id) for c_id in c_ids ]
+        h_date = datetime.now()
+        h_data = cols.astring(constants.MIN_DATA, constants.MAX_DATA, len(c_ids))
+        return [ [ c_ids[i], h_c_d_id, h_c_w_id, h_c_d_id, h_c_w_id, h_date, constants.INITIAL_AMOUNT, h_data[i] ] for i in xrange(len(c_ids)) ]
+    ## DEF
+    
+    def generateOrderBatch(self, o_w_id, o_d_id, o_ids, cIdPermutation):
+        cols = self.columns
+        if cols == None:
+            return [ self.generateOrder(o_w_id, o_d_id, o_id, cIdPermutation[o_id - 1], \
+                                        rand.number(constants.MIN_OL_CNT, constants.MAX_OL_CNT), self.isNewOrder(o_id)) for o_id in o_ids ]
+        n = len(o_ids)
+        o_entry_d = datetime.now()
+        o_ol_cnts = cols.number(constants.MIN_OL_CNT, constants.MAX_OL_CNT, n).tolist()
+        o_carrier_ids = cols.number(constants.MIN_CARRIER_ID, constants.MAX_CARRIER_ID, n).tolist()
+        tuples = [ ]
+        for i in xrange(n):
+            o_id = o_ids[i]
+            o_carrier_id = constants.NULL_CARRIER_ID if self.isNewOrder(o_id) else o_carrier_ids[i]
+            tuples.append([ o_id, cIdPermutation[o_id - 1], o_d_id, o_w_id, o_entry_d, o_carrier_id, o_ol_cnts[i], constants.INITIAL_ALL_LOCAL ])
+        ## FOR
+        return tuples
+    ## DEF
+    
+    def generateOrderLineBatch(self, ol_w_id, ol_d_id, o_tuples):
+        """Return the ORDER_LINE rows of the given ORDERS rows"""
+        max_items = self.scaleParameters.items
+        cols = self.columns
+        if cols == None:
+            tuples = [ ]
+            for o in o_tuples:
+                newOrder = self.isNewOrder(o[0])
+                for ol_number in range(0, o[6]):
+                    tuples.append(self.generateOrderLine(ol_w_id, ol_d_id, o[0], ol_number, max_items, newOrder))
+            ## FOR
+            return tuples
+        ## IF
+        
+        ol_o_ids = [ ]
+        ol_numbers = [ ]
+        for o in o_tuples:
+            ol_o_ids += [ o[0] ] * o[6]
+            ol_numbers += range(0, o[6])
+        ## FOR
+        n = len(ol_o_ids)
+        ol_i_ids = cols.number(1, max_items, n).tolist()
+        ol_amounts = cols.fixedPoint(constants.MONEY_DECIMALS, constants.MIN_AMOUNT, constants.MAX_PRICE * constants.MAX_OL_QUANTITY, n).tolist()
+        ol_dist_info = cols.astring(constants.DIST, constants.DIST, n)
+        ol_delivery_d = datetime.now()
+        
+        ## 1% of items are from a remote warehouse, see rand.numberExcluding()
+        sp = self.scaleParameters
+        if sp.warehouses > 1:
+            remote = (cols.number(1, 100, n) == 1)
+            other = cols.number(sp.starting_warehouse, sp.ending_warehouse-1, n)
+            other += (other >= ol_w_id)
+            ol_supply_w_ids = numpy.where(remote, other, ol_w_id).tolist()
+        else:
+            ol_supply_w_ids = [ ol_w_id ] * n
+        
+        tuples = [ ]
+        for i in xrange(n):
+            if self.isNewOrder(ol_o_ids[i]):
+                t = [ ol_o_ids[i], ol_d_id, ol_w_id, ol_numbers[i], ol_i_ids[i], ol_supply_w_ids[i], None, constants.INITIAL_QUANTITY, ol_amounts[i], ol_dist_info[i] ]
+            else:
+                t = [ ol_o_ids[i], ol_d_id, ol_w_id, ol_numbers[i], ol_i_ids[i], ol_supply_w_ids[i], ol_delivery_d, constants.INITIAL_QUANTITY, 0.00, ol_dist_info[i] ]
+            tuples.append(t)
+        ## FOR
+        return tuples
+    ## DEF
+    
+    def generateZipBatch(self, size):
+        length = constants.ZIP_LENGTH - len(constants.ZIP_SUFFIX)
+        return [ z + constants.ZIP_SUFFIX for z in self.columns.nstring(length, length, size) ]
+    ## DEF
+    
+    def fillOriginalBatch(self, data, ids, originalRows):
+        """Put ORIGINAL_STRING into the data of the rows whose id is in originalRows"""
+        for i in xrange(len(ids)):
+            if ids[i] in originalRows: data[i] = self.fillOriginal(data[i])
+        return data
+    ## DEF
 ## CLASS
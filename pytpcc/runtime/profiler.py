@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import os
+import sys
+import dis
+import time
+import linecache
+import threading
+
+## How often the threads are sampled, in seconds
+DEFAULT_INTERVAL = 0.005
+
+## Where the time of a sample goes, in the order they are reported
+CATEGORIES = [
+    ("db", "Blocking DB I/O"),
+    ("driver", "Driver Python code"),
+    ("generate", "Parameter generation"),
+    ("results", "Result bookkeeping"),
+    ("harness", "Other harness code"),
+    ("idle", "Idle / waiting"),
+]
+GENERATE_MODULES = [ "batchgen.py", "rand.py", "nurand.py", "deck.py", "txnlog.py" ]
+GENERATE_FUNCTIONS = [ "doOne", "selectTransaction" ]
+RESULTS_MODULES = [ "results.py", "recorder.py", "histogram.py", "timeseries.py", "progress.py" ]
+IDLE_MODULES = [ "threading.py", "Queue.py" ]
+DRIVERS_DIR = os.sep + "drivers" + os.sep
+
+## A frame that stopped at one of these is inside a call to C code,
+## e.g. the database module's cursor.execute()
+CALL_OPCODES = set([ op for name, op in dis.opmap.iteritems() if name.startswith("CALL_FUNCTION") ])
+
+## ==============================================
+## Profiler
+## ==============================================
+class Profiler:
+    """
+        Statistical profiler for a client process. A background thread takes a
+        snapshot of the stacks of all the other threads every 'interval' seconds
+        through sys._current_frames(). It counts the stacks in the collapsed format
+        that flamegraph tools read, and sorts each sample into one of CATEGORIES
+        by the innermost frame that belongs to the driver, the result bookkeeping
+        or the parameter generation. A driver frame that is in the middle of a call
+        into C code is counted as blocking DB I/O.
+    """
+
+    def __init__(self, interval = DEFAULT_INTERVAL):
+        assert interval > 0
+        self.interval = interval
+        self.stacks = { }
+        self.categories = dict([ (c, 0) for c, name in CATEGORIES ])
+        self.thread = None
+        self.running = False
+    ## DEF
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+    ## DEF
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+    ## DEF
+
+    def run(self):
+        me = threading.currentThread().ident
+        while self.running:
+            time.sleep(self.interval)
+            for ident, frame in sys._current_frames().items():
+                if ident != me: self.sample(frame)
+        ## WHILE
+    ## DEF
+
+    def sample(self, frame):
+        stack = [ ]
+        f = frame
+        while f != None:
+            code = f.f_code
+            stack.append("%s (%s)" % (code.co_name, os.path.basename(code.co_filename)))
+            f = f.f_back
+        ## WHILE
+        stack.reverse()
+        key = ";".join(stack)
+        self.stacks[key] = self.stacks.get(key, 0) + 1
+        self.categories[self.classify(frame)] += 1
+    ## DEF
+
+    def classify(self, leaf):
+        """Return the category of a sample with the given innermost frame"""
+        f = leaf
+        while f != None:
+            code = f.f_code
+            filename = code.co_filename
+            module = os.path.basename(filename)
+            if f is leaf and (module in IDLE_MODULES or isSleeping(f)):
+                return "idle"
+            if filename.find(DRIVERS_DIR) >= 0:
+                return "db" if f is leaf and isInCall(f) else "driver"
+            if module in RESULTS_MODULES:
+                return "results"
+            if module in GENERATE_MODULES:
+                return "generate"
+            if module == "executor.py" and isGenerateFunction(code.co_name):
+                return "generate"
+            f = f.f_back
+        ## WHILE
+        return "harness"
+    ## DEF
+
+    def write(self, path):
+        """Write the collapsed stacks to the given file"""
+        with open(path, "w") as output:
+            for key in sorted(self.stacks.keys()):
+                output.write("%s %d\n" % (key, self.stacks[key]))
+        ## WITH
+    ## DEF
+
+    def summary(self):
+        """Return the share of the samples per category, and the share of the
+        busy (not idle) time that was spent outside of the driver"""
+        total = max(sum(self.categories.values()), 1)
+        ret = ""
+        for c, name in CATEGORIES:
+            ret += "  %-24s%6.1f%%  (%d samples)\n" % (name, self.categories[c] * 100.0 / total, self.categories[c])
+        busy = total - self.categories["idle"]
+        outside = busy - self.categories["db"] - self.categories["driver"]
+        ret += "  %-24s%6.1f%%" % ("Outside the driver", outside * 100.0 / max(busy, 1))
+        return ret
+    ## DEF
+## CLASS
+
+def isInCall(frame):
+    """Return true if the frame is waiting for a call to return"""
+    return ord(frame.f_code.co_code[frame.f_lasti]) in CALL_OPCODES
+## DEF
+
+def isSleeping(frame):
+    return isInCall(frame) and linecache.getline(frame.f_code.co_filename, frame.f_lineno).find("sleep(") >= 0
+## DEF
+
+def isGenerateFunction(name):
+    return name in GENERATE_FUNCTIONS or name.startswith("generate") or (name.startswith("make") and name.endswith("Id"))
+## DEF
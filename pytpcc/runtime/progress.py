@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import time
+import multiprocessing
+
+import constants
+
+TXN_TYPES = [ constants.TransactionTypes.DELIVERY,
+              constants.TransactionTypes.NEW_ORDER,
+              constants.TransactionTypes.ORDER_STATUS,
+              constants.TransactionTypes.PAYMENT,
+              constants.TransactionTypes.STOCK_LEVEL ]
+
+## Every slot holds: <completed> <aborted> followed by <count> <response time>
+## of the measured transactions of each type in TXN_TYPES
+SLOT_SIZE = 2 + 2 * len(TXN_TYPES)
+
+## ==============================================
+## Progress
+## ==============================================
+class Progress:
+    """
+        Live progress counters shared between the client processes and the parent.
+        The counters live in an unlocked shared-memory array with one slot per
+        executor. Each executor is the only writer of its slot and copies its
+        Results into it at most once per interval, so there is no locking or
+        IPC per transaction. The parent reads all slots to print a rolling line.
+        The array must be handed to the clients when they are created, e.g.
+        through the initializer of a multiprocessing.Pool.
+    """
+
+    def __init__(self, slots, interval):
+        assert slots > 0
+        assert interval > 0
+        self.slots = slots
+        self.interval = interval
+        self.data = multiprocessing.RawArray('d', slots * SLOT_SIZE)
+        self.last = None
+        self.last_time = None
+        self.start = None
+    ## DEF
+
+    ## ----------------------------------------------
+    ## Client side
+    ## ----------------------------------------------
+    def publish(self, slot, r):
+        """Copy the counters of the given Results into an executor's slot"""
+        r.collect()
+        values = [ r.completed, r.aborted ]
+        for txn in TXN_TYPES:
+            values.append(r.txn_counters.get(txn, 0))
+            values.append(r.txn_response_times.get(txn, 0))
+        base = slot * SLOT_SIZE
+        self.data[base:base + SLOT_SIZE] = values
+    ## DEF
+
+    ## ----------------------------------------------
+    ## Parent side
+    ## ----------------------------------------------
+    def totals(self):
+        """Return the sum of all the slots"""
+        data = self.data[:]
+        return [ sum(data[i::SLOT_SIZE]) for i in range(SLOT_SIZE) ]
+    ## DEF
+
+    def report(self, now = None):
+        """Return the progress line for the time since the last report"""
+        if now == None: now = time.time()
+        totals = self.totals()
+        if self.last == None:
+            self.start = self.last_time = now
+            self.last = [ 0 ] * SLOT_SIZE
+        elapsed = max(now - self.last_time, 1e-6)
+        delta = [ totals[i] - self.last[i] for i in range(SLOT_SIZE) ]
+        self.last = totals
+        self.last_time = now
+
+        no = 2 + 2 * TXN_TYPES.index(constants.TransactionTypes.NEW_ORDER)
+        measured = sum(delta[2::2])
+        latency = sum(delta[3::2]) / measured * 1000 if measured else 0.0
+        return "[%5ds] %8.1f txn/s  %6.1f err/s  tpmC %9.1f  avg latency %7.2f ms" % \
+               (now - self.start, delta[0] / elapsed, delta[1] / elapsed, delta[no] * 60 / elapsed, latency)
+    ## DEF
+
+    def watch(self, isDone, output):
+        """Print a progress line every interval seconds until isDone() returns true"""
+        self.report()
+        while not isDone():
+            time.sleep(self.interval)
+            if isDone(): break
+            print >> output, self.report()
+            output.flush()
+        ## WHILE
+    ## DEF
+## CLASS
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import random
+
+## ==============================================
+## RetryPolicy
+## ==============================================
+class RetryPolicy:
+    """
+        Decides whether a failed transaction is retried with the same parameters
+        and how long to wait before. Only the errors that the driver marks as
+        retryable (see AbstractDriver.isRetryable) are retried, at most max_retries
+        times. The wait is drawn uniformly from [0, min(max_backoff, backoff * 2^retry)]
+        ("full jitter"), so that clients that collided do not retry in lockstep.
+    """
+
+    def __init__(self, max_retries, backoff = 0.01, max_backoff = 1.0):
+        assert max_retries >= 0
+        assert backoff >= 0 and max_backoff >= backoff
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+    ## DEF
+
+    def shouldRetry(self, driver, error, retries):
+        """Return true if a transaction that already was retried 'retries' times should be retried after error"""
+        return retries < self.max_retries and driver.isRetryable(error)
+    ## DEF
+
+    def getDelay(self, retries):
+        """Return how many seconds to wait before the next retry"""
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** retries)))
+    ## DEF
+## CLASS
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import os
+import mmap
+import struct
+import marshal
+import logging
+from datetime import datetime
+
+import constants
+
+## The file starts with this magic string, followed by one record per
+## transaction: <payload length:uint32><txn code:uint8><payload>
+## The payload is the marshal'd tuple of the txn's parameters in the
+## order given by TXN_FIELDS.
+MAGIC = "TPCCTXN1"
+HEADER = struct.Struct("<IB")
+
+## The timestamp parameters are not recorded. They are set to the current
+## time when the transaction is replayed.
+DATE_FIELDS = [ "o_entry_d", "h_date", "ol_delivery_d" ]
+
+TXN_FIELDS = {
+    constants.TransactionTypes.DELIVERY: [ "w_id", "o_carrier_id", "ol_delivery_d" ],
+    constants.TransactionTypes.NEW_ORDER: [ "w_id", "d_id", "c_id", "o_entry_d", "i_ids", "i_w_ids", "i_qtys" ],
+    constants.TransactionTypes.ORDER_STATUS: [ "w_id", "d_id", "c_id", "c_last" ],
+    constants.TransactionTypes.PAYMENT: [ "w_id", "d_id", "h_amount", "c_w_id", "c_d_id", "c_id", "c_last", "h_date" ],
+    constants.TransactionTypes.STOCK_LEVEL: [ "w_id", "d_id", "threshold" ],
+}
+TXN_CODES = sorted(TXN_FIELDS.keys())
+
+## ==============================================
+## TxnLogWriter
+## ==============================================
+class TxnLogWriter:
+    """Append (txn, params) records to a transaction log file"""
+
+    def __init__(self, path):
+        logging.info("Recording transaction parameters to '%s'" % path)
+        self.path = path
+        self.output = open(path, "wb", 1 << 20)
+        self.output.write(MAGIC)
+        self.fields = dict([ (txn, [ f for f in TXN_FIELDS[txn] if not f in DATE_FIELDS ]) for txn in TXN_CODES ])
+        self.codes = dict([ (txn, TXN_CODES.index(txn)) for txn in TXN_CODES ])
+    ## DEF
+
+    def write(self, txn, params):
+        payload = marshal.dumps(tuple([ params[f] for f in self.fields[txn] ]), 2)
+        self.output.write(HEADER.pack(len(payload), self.codes[txn]))
+        self.output.write(payload)
+    ## DEF
+
+    def close(self):
+        self.output.close()
+    ## DEF
+## CLASS
+
+## ==============================================
+## TxnLogReader
+## ==============================================
+class TxnLogReader:
+    """Stream the records of a transaction log file back through a memory map"""
+
+    def __init__(self, path):
+        logging.info("Replaying transaction parameters from '%s'" % path)
+        self.path = path
+        self.input = open(path, "rb")
+        self.size = os.fstat(self.input.fileno()).st_size
+        assert self.size >= len(MAGIC), "Invalid transaction log '%s'" % path
+        self.data = mmap.mmap(self.input.fileno(), 0, access=mmap.ACCESS_READ)
+        assert self.data[:len(MAGIC)] == MAGIC, "Invalid transaction log '%s'" % path
+        self.offset = len(MAGIC)
+        self.fields = [ TXN_FIELDS[txn] for txn in TXN_CODES ]
+    ## DEF
+
+    def next(self):
+        """Return the next (txn, params) pair, or (None, None) at the end of the log"""
+        if self.offset + HEADER.size > self.size:
+            return (None, None)
+        length, code = HEADER.unpack_from(self.data, self.offset)
+        start = self.offset + HEADER.size
+        self.offset = start + length
+        values = iter(marshal.loads(self.data[start:self.offset]))
+
+        now = datetime.now()
+        params = { }
+        for f in self.fields[code]:
+            params[f] = now if f in DATE_FIELDS else values.next()
+        return (TXN_CODES[code], params)
+    ## DEF
+
+    def close(self):
+        self.data.close()
+        self.input.close()
+    ## DEF
+## CLASS
@@ -34,7 +34,10 @@ import re
 import argparse
 import glob
 import time 
+import random
 import multiprocessing
+import threading
+import traceback
 from ConfigParser import SafeConfigParser
 from pprint import pprint,pformat
 
@@ -47,6 +50,12 @@ logging.basicConfig(level = logging.INFO,
                     datefmt="%m-%d-%Y %H:%M:%S",
                     stream = sys.stdout)
                     
+## Live progress board shared with the client processes, see runtime/progress.py
+progressBoard = None
+
+## Work units shared by the loader processes, see startLoading()
+loadQueue = None
+
 ## ==============================================
 ## createDriverClass
 ## ==============================================
@@ -71,35 +80,51 @@ def getDrivers():
 ## startLoading
 ## ==============================================
 def startLoading(driverClass, scaleParameters, args, config):
-    logging.debug("Creating client pool with %d processes" % args['clients'])
-    pool = multiprocessing.Pool(args['clients'])
-    debug = logging.getLogger().isEnabledFor(logging.DEBUG)
-    
-    # Split the warehouses into chunks
-    w_ids = map(lambda x: [ ], range(args['clients']))
-    for w_id in range(scaleParameters.starting_warehouse, scaleParameters.ending_warehouse+1):
-        idx = w_id % args['clients']
-        w_ids[idx].append(w_id)
+    # Split the warehouses into district-sized units that every loader pulls
+    # from a shared queue, so that all of the clients stay busy even when
+    # there are fewer warehouses than clients
+    w_ids = range(scaleParameters.starting_warehouse, scaleParameters.ending_warehouse+1)
+    units = loader.makeWorkUnits(scaleParameters, w_ids, scaleParameters.starting_warehouse == 1)
+    queue = multiprocessing.Queue()
+    for unit in units:
+        queue.put(unit)
+    for i in range(args['clients']):
+        queue.put(None)
     ## FOR
     
+    logging.debug("Creating client pool with %d processes for %d work units" % (args['clients'], len(units)))
+    pool = multiprocessing.Pool(args['clients'], initializer=initLoader, initargs=(queue,))
+    debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+    
     loader_results = [ ]
     for i in range(args['clients']):
-        r = pool.apply_async(loaderFunc, (driverClass, scaleParameters, args, config, w_ids[i], scaleParameters.starting_warehouse == 1))
+        r = pool.apply_async(loaderFunc, (driverClass, scaleParameters, args, config, debug))
         loader_results.append(r)
     ## FOR
     
     pool.close()
     logging.debug("Waiting for %d loaders to finish" % args['clients'])
     pool.join()
+    for r in loader_results:
+        r.get()
+## DEF
+
+## ==============================================
+## initLoader
+## ==============================================
+def initLoader(queue):
+    """Runs in every loader process before it starts loading"""
+    global loadQueue
+    loadQueue = queue
 ## DEF
 
 ## ==============================================
 ## loaderFunc
 ## ==============================================
-def loaderFunc(driverClass, scaleParameters, args, config, w_ids, debug):
+def loaderFunc(driverClass, scaleParameters, args, config, debug):
     driver = driverClass(args['ddl'])
     assert driver != None
-    logging.debug("Starting client execution: %s [warehouses=%d]" % (driver, len(w_ids)))
+    logging.debug("Starting client execution: %s" % driver)
     
     config['load'] = True
     config['execute'] = False
@@ -107,10 +132,9 @@ def loaderFunc(driverClass, scaleParameters, args, config, w_ids, debug):
     driver.loadConfig(config)
    
     try:
-        loadItems = (1 in w_ids)
-        l = loader.Loader(driver, scaleParameters, w_ids, loadItems)
+        l = makeLoader(driver, scaleParameters, args, [ ], False)
         driver.loadStart()
-        l.execute()
+        l.executeQueue(loadQueue)
         driver.loadFinish()   
     except KeyboardInterrupt:
             return -1
@@ -122,20 +146,44 @@ def loaderFunc(driverClass, scaleParameters, args, config, w_ids, debug):
         
 ## DEF
 
+## ==============================================
+## makeLoader
+## ==============================================
+def makeLoader(driver, scaleParameters, args, w_ids, loadItems):
+    """Load from the dataset cache if there is one, otherwise generate the data"""
+    if args['cache']:
+        l = datacache.SegmentLoader(driver, getCachePath(args), scaleParameters, w_ids, loadItems)
+    else:
+        l = loader.Loader(driver, scaleParameters, w_ids, loadItems, args['seed'])
+    if args['checkpoint']:
+        l.checkpoint = checkpoint.Checkpoint(args['checkpoint']).read()
+    return l
+## DEF
+
+def getCachePath(args):
+    seed = args['seed'] if args['seed'] != None else datacache.DEFAULT_SEED
+    return datacache.cachePath(args['cache'], args['warehouses'], args['scalefactor'], seed)
+## DEF
+
 ## ==============================================
 ## startExecution
 ## ==============================================
 def startExecution(driverClass, scaleParameters, args, config):
     logging.debug("Creating client pool with %d processes" % args['clients'])
-    pool = multiprocessing.Pool(args['clients'])
+    pool = multiprocessing.Pool(args['clients'], initializer=initClient, initargs=(progressBoard,))
     debug = logging.getLogger().isEnabledFor(logging.DEBUG)
     
+    ## Each client runs threads_per_client * terminals terminals
+    terminals_per_client = args['threads_per_client'] * args['terminals']
+    
     worker_results = [ ]
     for i in range(args['clients']):
-        r = pool.apply_async(executorFunc, (driverClass, scaleParameters, args, config, debug,))
+        r = pool.apply_async(executorFunc, (driverClass, scaleParameters, args, config, debug, i * terminals_per_client))
         worker_results.append(r)
     ## FOR
     pool.close()
+    if progressBoard != None:
+        progressBoard.watch(lambda: all([ r.ready() for r in worker_results ]), sys.stdout)
     pool.join()
     
     total_results = results.Results()
@@ -150,19 +198,46 @@ def startExecution(driverClass, scaleParameters, args, config):
     return (total_results)
 ## DEF
 
+## ==============================================
+## initClient
+## ==============================================
+def initClient(board):
+    """Runs in every client process before it starts executing"""
+    global progressBoard
+    progressBoard = board
+## DEF
+
+## ==============================================
+## watchProgress
+## ==============================================
+def watchProgress():
+    """Print the live progress from a background thread until the returned event is set"""
+    done = threading.Event()
+    t = threading.Thread(target=progressBoard.watch, args=(done.isSet, sys.stdout))
+    t.daemon = True
+    t.start()
+    return done
+## DEF
+
 ## ==============================================
 ## executorFunc
 ## ==============================================
-def executorFunc(driverClass, scaleParameters, args, config, debug):
-    driver = driverClass(args['ddl'])
-    assert driver != None
-    logging.debug("Starting client execution: %s" % driver)
+def executorFunc(driverClass, scaleParameters, args, config, debug, terminal_id = 0):
+    client_id = terminal_id / (args['threads_per_client'] * args['terminals'])
+    return runProfiled(args, client_id, runClient, driverClass, scaleParameters, args, config, terminal_id)
+## DEF
+
+## ==============================================
+## runClient
+## ==============================================
+def runClient(driverClass, scaleParameters, args, config, terminal_id = 0):
+    if args['threads_per_client'] > 1:
+        return startThreads(driverClass, scaleParameters, args, config, terminal_id)
     
-    config['execute'] = True
-    config['reset'] = False
-    driver.loadConfig(config)
+    driver = createExecutionDriver(driverClass, args, config)
+    logging.debug("Starting client execution: %s" % driver)
 
-    e = executor.Executor(driver, scaleParameters, stop_on_error=args['stop_on_error'])
+    e = makeExecutor(driver, driverClass, scaleParameters, args, config, terminal_id)
     driver.executeStart()
     results = e.execute(args['duration'])
     driver.executeFinish()
@@ -170,6 +245,139 @@ def executorFunc(driverClass, scaleParameters, args, config, debug):
     return results
 ## DEF
 
+## ==============================================
+## runProfiled
+## ==============================================
+def runProfiled(args, client_id, func, *fargs):
+    """Run func(*fargs) and, with --profile, sample it and write the
+    collapsed stacks of this client to <profile>.<client_id>"""
+    if not args['profile']: return func(*fargs)
+    p = profiler.Profiler()
+    p.start()
+    try:
+        return func(*fargs)
+    finally:
+        p.stop()
+        path = "%s.%d" % (args['profile'], client_id)
+        p.write(path)
+        logging.info("Wrote the profile of client %d to '%s'\n%s" % (client_id, path, p.summary()))
+## DEF
+
+## ==============================================
+## startThreads
+## ==============================================
+def startThreads(driverClass, scaleParameters, args, config, terminal_id = 0):
+    """Run several executor loops on threads inside this process, each with
+    its own driver connection, and merge their results."""
+    num_threads = args['threads_per_client']
+    logging.debug("Starting %d executor threads" % num_threads)
+    
+    thread_results = [ None ] * num_threads
+    def threadFunc(idx):
+        try:
+            driver = createExecutionDriver(driverClass, args, config)
+            e = makeExecutor(driver, driverClass, scaleParameters, args, config, terminal_id + idx * args['terminals'])
+            driver.executeStart()
+            thread_results[idx] = e.execute(args['duration'])
+            driver.executeFinish()
+        except (Exception, AssertionError), ex:
+            logging.warn("Executor thread %d failed: %s" % (idx, ex))
+            traceback.print_exc(file=sys.stdout)
+            thread_results[idx] = -1
+    ## DEF
+    
+    threads = [ ]
+    for i in range(num_threads):
+        t = threading.Thread(target=threadFunc, args=(i,))
+        t.start()
+        threads.append(t)
+    ## FOR
+    for t in threads:
+        t.join()
+    
+    total_results = results.Results()
+    for r in thread_results:
+        if r == -1: return -1
+        total_results.append(r)
+    ## FOR
+    return (total_results)
+## DEF
+
+## ==============================================
+## createExecutionDriver
+## ==============================================
+def createExecutionDriver(driverClass, args, config):
+    driver = driverClass(args['ddl'])
+    assert driver != None
+
+    config = dict(config)
+    config['execute'] = True
+    config['reset'] = False
+    driver.loadConfig(config)
+    return driver
+## DEF
+
+## ==============================================
+## makeExecutor
+## ==============================================
+def makeExecutor(driver, driverClass, scaleParameters, args, config, terminal_id = 0):
+    mix = [ int(i) for i in args['mix'].split(',') ]
+    ## The target rate is split evenly across the clients and their threads
+    rate = None
+    if args['rate']: rate = args['rate'] / float(args['clients'] * args['threads_per_client'])
+    ## Every executor records to / replays from its own file when there is more than one
+    executor_id = terminal_id / args['terminals']
+    record = args['record']
+    replay = args['replay']
+    if args['clients'] * args['threads_per_client'] > 1:
+        if record: record = "%s.%d" % (record, executor_id)
+        if replay and os.path.exists("%s.%d" % (replay, executor_id)): replay = "%s.%d" % (replay, executor_id)
+    ## IF
+    retry_policy = None
+    if args['max_retries'] > 0:
+        retry_policy = retry.RetryPolicy(args['max_retries'], args['retry_backoff'], args['retry_max_backoff'])
+    ## The per-executor time series are merged into args['timeseries'] at the end.
+    ## It is only kept when asked for, --export on its own needs the aggregates only
+    timeseries = None
+    interval = None
+    if args['timeseries']:
+        timeseries = "%s.%d" % (args['timeseries'], executor_id)
+        interval = args['interval']
+    ## IF
+    
+    ## Only bind the terminals to a home warehouse if asked to
+    if not args['bind_terminals']: terminal_id = None
+
+    makeDriver = lambda: createExecutionDriver(driverClass, args, config)
+    delivery_queue = None
+    if args['delivery_workers'] > 0:
+        delivery_queue = deliveryqueue.DeliveryQueue(makeDriver, args['delivery_workers'], retry_policy)
+
+    kwargs = {
+        "stop_on_error": args['stop_on_error'],
+        "batch_size": args['batch_size'],
+        "terminal_id": terminal_id,
+        "delivery_queue": delivery_queue,
+        "record": record,
+        "replay": replay,
+        "use_deck": args['deck'],
+        "warmup": args['warmup'],
+        "cooldown": args['cooldown'],
+        "steady_state": args['steady_state'],
+        "timeseries": timeseries,
+        "interval": interval,
+        "progress": progressBoard,
+        "progress_slot": executor_id,
+        "retry_policy": retry_policy,
+        "rate": rate,
+        "arrival": args['arrival'],
+    }
+    if args['terminals'] > 1:
+        return asyncexecutor.AsyncExecutor(driver, scaleParameters, mix, args['terminals'],
+                                           makeDriver=makeDriver, pool_size=args['terminal_threads'], **kwargs)
+    return executor.Executor(driver, scaleParameters, mix, **kwargs)
+## DEF
+
 ## ==============================================
 ## main
 ## ==============================================
@@ -185,18 +393,72 @@ if __name__ == '__main__':
                          help='Benchmark scale factor')
     aparser.add_argument('--mix', default='4,4,4,43,45', metavar='SL,D,OS,P,NO',
                          help='Transaction mix')
+    aparser.add_argument('--deck', action='store_true',
+                         help='Schedule the transaction mix with a shuffled deck of cards, which keeps the exact mix over every sum(MIX) transactions')
+    aparser.add_argument('--seed', default=None, type=int, metavar='S',
+                         help='Seed the random generators, so that the same data is loaded every time')
+    aparser.add_argument('--cache', default=None, metavar='DIR',
+                         help='Load the data from the dataset that generate.py wrote under DIR for these warehouses, scale factor and seed')
+    aparser.add_argument('--checkpoint', default=None, metavar='PATH',
+                         help='Record the work units that have been loaded in PATH')
+    aparser.add_argument('--resume', action='store_true',
+                         help='Resume the load recorded with --checkpoint, loading only the missing work units')
     aparser.add_argument('--skip-warehouses', default=0, type=int, metavar='SW',
                          help='Number of Warehouses previously loaded')
     aparser.add_argument('--warehouses', default=4, type=int, metavar='W',
                          help='Number of Warehouses')
     aparser.add_argument('--duration', default=60, type=int, metavar='D',
-                         help='How long to run the benchmark in seconds')
+                         help='How long to measure the benchmark in seconds')
+    aparser.add_argument('--warmup', default=0, type=int, metavar='W',
+                         help='Run transactions for W seconds before the measurement starts')
+    aparser.add_argument('--cooldown', default=0, type=int, metavar='C',
+                         help='Keep running transactions for C seconds after the measurement stops')
+    aparser.add_argument('--steady-state', action='store_true',
+                         help='Start the measurement as soon as the throughput is stable, waiting at most --warmup seconds')
+    aparser.add_argument('--timeseries', default=None, metavar='PATH',
+                         help='Stream per-interval throughput and latency of every executor to PATH.N and write the merged timeline to PATH')
+    aparser.add_argument('--interval', default=1.0, type=float, metavar='I',
+                         help='Length of the --timeseries intervals in seconds')
+    aparser.add_argument('--export', default=None, metavar='PATH',
+                         help='Write the results and the run metadata to PATH as JSON. With --timeseries, the intervals are included and also written to a .csv next to it')
+    aparser.add_argument('--progress', default=0, type=float, metavar='N',
+                         help='Print the live throughput, errors and latency of all the clients every N seconds')
+    aparser.add_argument('--statement-timing', action='store_true',
+                         help='Time every SQL statement of the drivers that support it and report them per transaction')
+    aparser.add_argument('--max-retries', default=0, type=int, metavar='N',
+                         help='Retry transactions that failed with an error the driver marks as retryable up to N times')
+    aparser.add_argument('--retry-backoff', default=0.01, type=float, metavar='S',
+                         help='Base of the exponential backoff between retries in seconds')
+    aparser.add_argument('--retry-max-backoff', default=1.0, type=float, metavar='S',
+                         help='Longest backoff between retries in seconds')
+    aparser.add_argument('--profile', default=None, metavar='PATH',
+                         help='Sample every client and write its collapsed stacks to PATH.N, with a summary of where the time went')
     aparser.add_argument('--ddl', default=os.path.realpath(os.path.join(os.path.dirname(__file__), "tpcc.sql")),
                          help='Path to the TPC-C DDL SQL file')
     aparser.add_argument('--clients', default=1, type=int, metavar='N',
                          help='The number of blocking clients to fork')
+    aparser.add_argument('--rate', default=None, type=float, metavar='TPS',
+                         help='Run open-loop, submitting TPS transactions per second across all clients')
+    aparser.add_argument('--arrival', default='fixed', choices=executor.ARRIVAL_SCHEDULES,
+                         help='Arrival schedule for the open-loop --rate mode')
+    aparser.add_argument('--threads-per-client', default=1, type=int, metavar='T',
+                         help='The number of executor threads to run inside each client, each with its own driver connection')
+    aparser.add_argument('--terminals', default=1, type=int, metavar='T',
+                         help='The number of virtual terminals to run inside each client')
+    aparser.add_argument('--terminal-threads', default=None, type=int, metavar='P',
+                         help='Size of the thread pool used to run a synchronous driver for the virtual terminals (default: one per terminal)')
+    aparser.add_argument('--bind-terminals', action='store_true',
+                         help='Bind every terminal to a fixed home warehouse and district, spread across all warehouses')
+    aparser.add_argument('--delivery-workers', default=0, type=int, metavar='N',
+                         help='Defer DELIVERY transactions to a queue drained by N background workers per executor (0 runs them inline)')
+    aparser.add_argument('--record', default=None, metavar='PATH',
+                         help='Record the transaction parameters to PATH (PATH.N for each executor when there are several)')
+    aparser.add_argument('--replay', default=None, metavar='PATH',
+                         help='Replay the transaction parameters recorded with --record instead of generating them')
     aparser.add_argument('--stop-on-error', action='store_true',
                          help='Stop the transaction execution when the driver throws an exception.')
+    aparser.add_argument('--batch-size', default=0, type=int, metavar='B',
+                         help='Pre-generate transaction parameters in batches of B using NumPy (0 disables)')
     aparser.add_argument('--no-load', action='store_true',
                          help='Disable loading the data')
     aparser.add_argument('--no-execute', action='store_true',
@@ -209,6 +471,27 @@ if __name__ == '__main__':
 
     if args['debug']: logging.getLogger().setLevel(logging.DEBUG)
         
+    assert not (args['rate'] and args['terminals'] > 1), "--rate cannot be combined with --terminals, the virtual terminals always run closed-loop"
+    assert not args['resume'] or args['checkpoint'], "--resume needs the --checkpoint of the load"
+    assert not (args['resume'] and args['reset']), "--resume cannot be combined with --reset"
+    
+    ## A checkpointed load is seeded so that a resumed load generates the same data
+    ckpt = None
+    if args['checkpoint'] and not args['no_load']:
+        ckpt = checkpoint.Checkpoint(args['checkpoint'])
+        if args['resume']:
+            ckpt.read()
+            assert ckpt.metadata['warehouses'] == args['warehouses'] and ckpt.metadata['scalefactor'] == args['scalefactor'], \
+                "'%s' is the checkpoint of a load with %d warehouses and scale factor %g" % (args['checkpoint'], ckpt.metadata['warehouses'], ckpt.metadata['scalefactor'])
+            args['seed'] = ckpt.metadata['seed']
+            logging.info("Resuming the load with %d work units already done" % len(ckpt.done))
+        elif args['seed'] == None and args['cache']:
+            ## The data comes from the cache, so the load has its seed
+            args['seed'] = datacache.DEFAULT_SEED
+        elif args['seed'] == None:
+            args['seed'] = random.randint(0, 2**31-1)
+    ## IF
+        
     ## Create a handle to the target client driver
     driverClass = createDriverClass(args['system'])
     assert driverClass != None, "Failed to find '%s' class" % args['system']
@@ -232,6 +515,7 @@ if __name__ == '__main__':
         config = dict(map(lambda x: (x, defaultConfig[x][1]), defaultConfig.keys()))
     config['reset'] = args['reset']
     config['load'] = False
+    config['statement_timing'] = args['statement_timing']
     config['execute'] = False
     if config['reset']: logging.info("Reseting database")
     driver.loadConfig(config)
@@ -239,19 +523,26 @@ if __name__ == '__main__':
 
     ## Create ScaleParameters
     scaleParameters = scaleparameters.makeWithScaleFactor(args['warehouses'], args['scalefactor'])
+    if args['seed'] != None: random.seed(args['seed'])
     nurand = rand.setNURand(nurand.makeForLoad())
+    if args['cache']: datacache.setNURand(getCachePath(args))
+    if ckpt != None and not args['resume']:
+        ckpt.create({ "seed": args['seed'], "warehouses": args['warehouses'], "scalefactor": args['scalefactor'],
+                      "nurand": [ rand.nurandVar.cLast, rand.nurandVar.cId, rand.nurandVar.orderLineItemId ] })
+    elif ckpt != None:
+        c = ckpt.metadata['nurand']
+        assert [ rand.nurandVar.cLast, rand.nurandVar.cId, rand.nurandVar.orderLineItemId ] == c, \
+            "The NURand constants differ from the ones that the load was started with"
     if args['debug']: logging.debug("Scale Parameters:\n%s" % scaleParameters)
     scaleParameters.starting_warehouse = int(args['skip_warehouses'])+1
 
-    mix = [ int(i) for i in args['mix'].split(',') ]
-    
     ## DATA LOADER!!!
     load_time = None
     if not args['no_load']:
         logging.info("Loading TPC-C benchmark data using %s" % (driver))
         load_start = time.time()
         if args['clients'] == 1:
-            l = loader.Loader(driver, scaleParameters, range(scaleParameters.starting_warehouse, scaleParameters.ending_warehouse+1), scaleParameters.starting_warehouse == 1)
+            l = makeLoader(driver, scaleParameters, args, range(scaleParameters.starting_warehouse, scaleParameters.ending_warehouse+1), scaleParameters.starting_warehouse == 1)
             driver.loadStart()
             l.execute()
             driver.loadFinish()
@@ -262,14 +553,26 @@ if __name__ == '__main__':
     
     ## WORKLOAD DRIVER!!!
     if not args['no_execute']:
-        if args['clients'] == 1:
-            e = executor.Executor(driver, scaleParameters, mix, stop_on_error=args['stop_on_error'])
+        if args['progress'] > 0:
+            progressBoard = progress.Progress(args['clients'] * args['threads_per_client'], args['progress'])
+        done = None
+        if args['clients'] == 1 and args['threads_per_client'] == 1:
+            e = makeExecutor(driver, driverClass, scaleParameters, args, config)
+            if progressBoard != None: done = watchProgress()
             driver.executeStart()
-            results = e.execute(args['duration'])
+            results = runProfiled(args, 0, e.execute, args['duration'])
             driver.executeFinish()
+        elif args['clients'] == 1:
+            if progressBoard != None: done = watchProgress()
+            results = runProfiled(args, 0, startThreads, driverClass, scaleParameters, args, config)
         else:
             results = startExecution(driverClass, scaleParameters, args, config)
+        if done != None: done.set()
         assert results
+        if args['timeseries']: results.timeseries.write(args['timeseries'])
+        if args['export']:
+            metadata = export.makeMetadata(args, config, args['clients'])
+            export.writeExport(args['export'], results, metadata)
         print results.show(load_time)
     ## IF
     
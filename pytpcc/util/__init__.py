@@ -1,3 +1,3 @@
 # -*- coding: utf-8 -*-
 
-__all__ = ["scaleparameters", "rand", "nurand", "results"]
\ No newline at end of file
+__all__ = ["scaleparameters", "rand", "nurand", "results", "deck", "histogram", "timeseries", "recorder", "export", "randvec"]
\ No newline at end of file
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import random
+
+## ==============================================
+## Deck
+## ==============================================
+class Deck:
+    """
+        Transaction mix scheduler based on a shuffled deck of cards. See TPC-C 5.2.4.2 (page 69).
+        The deck holds weights[i] cards for transaction type i. Cards are drawn without
+        replacement and the deck is reshuffled once it is empty, so each shuffled deck
+        of sum(weights) draws, counted from the first draw, has exactly the requested mix.
+    """
+
+    def __init__(self, weights):
+        self.cards = [ ]
+        for i in range(len(weights)):
+            assert weights[i] >= 0
+            self.cards += [ i ] * weights[i]
+        ## FOR
+        assert len(self.cards) > 0, "Empty transaction mix"
+        self.next = len(self.cards)
+    ## DEF
+
+    def draw(self):
+        """Return the index of the next transaction type"""
+        if self.next == len(self.cards):
+            random.shuffle(self.cards)
+            self.next = 0
+        card = self.cards[self.next]
+        self.next += 1
+        return card
+    ## DEF
+## CLASS
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import os
+import sys
+import json
+import socket
+import logging
+import subprocess
+
+import timeseries
+from results import PERCENTILES
+
+## Version of the export format, bump it when the layout changes
+FORMAT_VERSION = 1
+
+## ==============================================
+## makeMetadata
+## ==============================================
+def makeMetadata(args, config, clients):
+    """Describe the run: the driver and its configuration, the scale, the mix,
+    the number of clients, the code revision and the host"""
+    return {
+        "driver": args['system'],
+        "config": dict([ (k, str(v)) for k, v in config.iteritems() if not "pass" in k.lower() ]),
+        "warehouses": args['warehouses'],
+        "scalefactor": args['scalefactor'],
+        "mix": args.get('mix'),
+        "clients": clients,
+        "threads_per_client": args.get('threads_per_client', 1),
+        "terminals": args.get('terminals', 1),
+        "duration": args['duration'],
+        "warmup": args.get('warmup', 0),
+        "cooldown": args.get('cooldown', 0),
+        "revision": getRevision(),
+        "host": socket.gethostname(),
+        "python": sys.version.split()[0],
+    }
+## DEF
+
+## ==============================================
+## getRevision
+## ==============================================
+def getRevision():
+    """Return the git revision of this checkout, or None if it is not one"""
+    try:
+        cwd = os.path.dirname(os.path.realpath(__file__))
+        proc = subprocess.Popen([ "git", "rev-parse", "HEAD" ], cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        out, err = proc.communicate()
+        if proc.returncode != 0: return None
+        return out.strip()
+    except OSError:
+        return None
+## DEF
+
+## ==============================================
+## writeExport
+## ==============================================
+def writeExport(path, results, metadata):
+    """Write the results and metadata to path as JSON. If the results have a
+    time series, its sparse intervals are included and it is also written
+    to <path without extension>.csv"""
+    data = { "version": FORMAT_VERSION, "metadata": metadata, "results": results.export() }
+    with open(path, "w") as output:
+        json.dump(data, output, indent=2, sort_keys=True)
+    logging.info("Exported results to '%s'" % path)
+
+    if results.timeseries != None:
+        csv = os.path.splitext(path)[0] + ".csv"
+        results.timeseries.writeCsv(csv, PERCENTILES)
+        logging.info("Exported time series to '%s'" % csv)
+## DEF
+
+## ==============================================
+## readExport
+## ==============================================
+def readExport(path):
+    """Load a file written by writeExport(). The time series, if any, is
+    returned as a timeseries.TimeSeries in data['results']['timeseries']."""
+    with open(path) as input:
+        data = json.load(input)
+    assert data.get("version") == FORMAT_VERSION, "Unsupported export format in '%s'" % path
+    r = data["results"]
+    if r["timeseries"] != None:
+        r["timeseries"] = timeseries.fromList(r["timeseries"], r["interval"])
+    return data
+## DEF
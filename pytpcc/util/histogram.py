@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+## Values are recorded in microseconds. Every power-of-two range is split into
+## HALF_BUCKETS linear sub-buckets, which bounds the relative error of any
+## reported value to 1/HALF_BUCKETS (~1.6%). Values above MAX_VALUE (~4.5 hours)
+## are clamped into the last bucket.
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF_BUCKETS = SUB_BUCKETS / 2
+MAX_VALUE = (1 << 34) - 1
+
+def bucketIndex(value):
+    """Return the bucket of the given value in microseconds"""
+    if value < SUB_BUCKETS: return max(value, 0)
+    if value > MAX_VALUE: value = MAX_VALUE
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF_BUCKETS + (value >> shift) - HALF_BUCKETS
+## DEF
+
+def bucketRange(index):
+    """Return the smallest and largest value that fall into the given bucket"""
+    if index < SUB_BUCKETS: return (index, index)
+    shift = (index - SUB_BUCKETS) / HALF_BUCKETS + 1
+    sub = (index - SUB_BUCKETS) % HALF_BUCKETS + HALF_BUCKETS
+    return (sub << shift, ((sub + 1) << shift) - 1)
+## DEF
+
+NUM_BUCKETS = bucketIndex(MAX_VALUE) + 1
+
+## ==============================================
+## Histogram
+## ==============================================
+class Histogram:
+    """
+        Fixed-size, log-bucketed latency histogram in the style of HdrHistogram.
+        Two histograms merge exactly by adding their bucket counts.
+    """
+
+    def __init__(self):
+        self.buckets = [ 0 ] * NUM_BUCKETS
+        self.count = 0
+        self.max = 0
+    ## DEF
+
+    def record(self, seconds):
+        """Record a latency given in seconds"""
+        value = int(seconds * 1000000)
+        self.buckets[bucketIndex(value)] += 1
+        self.count += 1
+        if value > self.max: self.max = value
+    ## DEF
+
+    def merge(self, other):
+        buckets = self.buckets
+        other_buckets = other.buckets
+        for i in xrange(NUM_BUCKETS):
+            if other_buckets[i]: buckets[i] += other_buckets[i]
+        self.count += other.count
+        if other.max > self.max: self.max = other.max
+    ## DEF
+
+    def mergeSparse(self, sparse):
+        """Merge the output of another histogram's sparse(). Without its maximum,
+        the upper bound of the highest bucket is used."""
+        buckets = self.buckets
+        for i, cnt in sparse.iteritems():
+            i = int(i)
+            buckets[i] += cnt
+            self.count += cnt
+            self.max = max(self.max, bucketRange(i)[1])
+        ## FOR
+    ## DEF
+
+    def sparse(self):
+        """Return the non-empty buckets as a {index: count} dict"""
+        buckets = self.buckets
+        return dict([ (i, buckets[i]) for i in xrange(NUM_BUCKETS) if buckets[i] ])
+    ## DEF
+
+    def percentile(self, p):
+        """Return the value in microseconds below which p percent of the recorded values fall"""
+        if self.count == 0: return 0
+        target = max(int(self.count * p / 100.0 + 0.5), 1)
+        seen = 0
+        for i in xrange(NUM_BUCKETS):
+            seen += self.buckets[i]
+            if seen >= target:
+                low, high = bucketRange(i)
+                return min(high, self.max)
+        ## FOR
+        return self.max
+    ## DEF
+## CLASS
+
+def fromSparse(sparse, maximum = None):
+    """Rebuild a Histogram from the output of Histogram.sparse(). Without the
+    maximum, the upper bound of the highest bucket is used."""
+    h = Histogram()
+    h.mergeSparse(sparse)
+    if maximum != None: h.max = maximum
+    return h
+## DEF
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import random
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import rand
+import nurand
+
+## ==============================================
+## RandomColumns
+## ==============================================
+class RandomColumns:
+    """
+        Vectorized versions of the functions in util/rand.py. Every method draws
+        a whole column of size values at once, with the same distribution as
+        its scalar counterpart.
+    """
+
+    def __init__(self, seed = None):
+        assert numpy != None, "NumPy is required for vectorized random columns"
+        self.rng = numpy.random.RandomState()
+        self.seed(seed)
+        self.lastNames = [ rand.makeLastName(i) for i in range(0, 1000) ]
+    ## DEF
+
+    def seed(self, seed = None):
+        """Seed from the 'random' module unless a seed is given, so that seeding
+        it still makes the run repeatable"""
+        if seed == None: seed = random.getrandbits(32)
+        self.rng.seed(seed)
+    ## DEF
+
+    def number(self, minimum, maximum, size):
+        return self.rng.randint(minimum, maximum+1, size)
+    ## DEF
+
+    def NURand(self, a, x, y, size):
+        """A non-uniform random number, as defined by TPC-C 2.1.6. (page 20)."""
+        assert x <= y
+        if rand.nurandVar is None:
+            rand.setNURand(nurand.makeForLoad())
+        if a == 255:
+            c = rand.nurandVar.cLast
+        elif a == 1023:
+            c = rand.nurandVar.cId
+        elif a == 8191:
+            c = rand.nurandVar.orderLineItemId
+        else:
+            raise Exception("a = %d is not a supported value" % a)
+        return (((self.number(0, a, size) | self.number(x, y, size)) + c) % (y - x + 1)) + x
+    ## DEF
+
+    def fixedPoint(self, decimal_places, minimum, maximum, size):
+        assert decimal_places > 0
+        assert minimum < maximum
+        multiplier = 10 ** decimal_places
+        int_min = int(minimum * multiplier + 0.5)
+        int_max = int(maximum * multiplier + 0.5)
+        return self.number(int_min, int_max, size) / float(multiplier)
+    ## DEF
+
+    def randomLastName(self, maxCID, size):
+        min_cid = 999
+        if (maxCID - 1) < min_cid: min_cid = maxCID - 1
+        names = numpy.array(self.lastNames, dtype=object)
+        return names[self.NURand(255, 0, min_cid, size)]
+    ## DEF
+
+    def astring(self, minimum_length, maximum_length, size):
+        """A list of size random alphabetic strings"""
+        return self.randomString(minimum_length, maximum_length, 'a', 26, size)
+    ## DEF
+
+    def nstring(self, minimum_length, maximum_length, size):
+        """A list of size random numeric strings"""
+        return self.randomString(minimum_length, maximum_length, '0', 10, size)
+    ## DEF
+
+    def randomString(self, minimum_length, maximum_length, base, numCharacters, size):
+        """Draw all of the characters as a (size, maximum_length) byte matrix and
+        view each row as a string. NumPy drops the trailing NUL bytes, which is
+        how the strings shorter than maximum_length get cut."""
+        chars = self.rng.randint(0, numCharacters, (size, maximum_length)).astype(numpy.uint8)
+        chars += ord(base)
+        if minimum_length < maximum_length:
+            lengths = self.number(minimum_length, maximum_length, size)
+            chars[numpy.arange(maximum_length) >= lengths[:, numpy.newaxis]] = 0
+        return chars.view("S%d" % maximum_length).ravel().tolist()
+    ## DEF
+## CLASS
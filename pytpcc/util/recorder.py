@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import time
+
+import constants
+from histogram import Histogram
+
+TXN_TYPES = [ constants.TransactionTypes.DELIVERY,
+              constants.TransactionTypes.NEW_ORDER,
+              constants.TransactionTypes.ORDER_STATUS,
+              constants.TransactionTypes.PAYMENT,
+              constants.TransactionTypes.STOCK_LEVEL ]
+
+## ==============================================
+## TimingRecorder
+## ==============================================
+class TimingRecorder:
+    """
+        Per-transaction timing with no bookkeeping between start and stop.
+        start() only returns a timestamp that the caller keeps. record() adds
+        the durations to preallocated per-type slots instead of looking up and
+        updating dicts. collect() copies the totals into the dicts that the
+        rest of Results works with.
+    """
+
+    def __init__(self):
+        self.index = dict([ (txn, i) for i, txn in enumerate(TXN_TYPES) ])
+        self.counts = [ 0 ] * len(TXN_TYPES)
+        self.service = [ 0.0 ] * len(TXN_TYPES)
+        self.response = [ 0.0 ] * len(TXN_TYPES)
+        self.histograms = [ Histogram() for txn in TXN_TYPES ]
+    ## DEF
+
+    def start(self):
+        """Return the start timestamp of a transaction"""
+        return time.time()
+    ## DEF
+
+    def record(self, txn, start, intended, now):
+        """Record a transaction that started at 'start' (at 'intended' on the
+        open-loop schedule) and completed at 'now'"""
+        i = self.index[txn]
+        response = now - intended
+        self.counts[i] += 1
+        self.service[i] += now - start
+        self.response[i] += response
+        self.histograms[i].record(response)
+    ## DEF
+
+    def collect(self, counters, times, response_times, histograms):
+        """Store the totals of every transaction type that ran in the given dicts"""
+        for i, txn in enumerate(TXN_TYPES):
+            if self.counts[i] == 0: continue
+            counters[txn] = self.counts[i]
+            times[txn] = self.service[i]
+            response_times[txn] = self.response[i]
+            histograms[txn] = self.histograms[i]
+        ## FOR
+    ## DEF
+## CLASS
@@ -27,22 +27,164 @@
 import logging
 import time
 
+import constants
+from histogram import Histogram
+from timeseries import TimeSeries
+from recorder import TimingRecorder
+
+## The percentiles reported by show()
+PERCENTILES = [ 50, 95, 99, 99.9 ]
+
+## The steady-state detector starts the measurement once the average throughput of
+## the last STEADY_STATE_SAMPLES seconds is within STEADY_STATE_TOLERANCE of the
+## average of the STEADY_STATE_SAMPLES seconds before them
+STEADY_STATE_SAMPLES = 5
+STEADY_STATE_TOLERANCE = 0.10
+
+## TPC-C 5.2.5.4 (page 57): at least 90% of each transaction type must have
+## a response time below these limits in seconds. For the deferred DELIVERY
+## the limit applies to the time until it is queued, and 90% of the deferred
+## deliveries must be completed within DEFERRED_DELIVERY_LIMIT (5.2.5.3)
+RESPONSE_TIME_PERCENTILE = 90
+RESPONSE_TIME_LIMITS = {
+    constants.TransactionTypes.NEW_ORDER: 5,
+    constants.TransactionTypes.PAYMENT: 5,
+    constants.TransactionTypes.ORDER_STATUS: 5,
+    constants.TransactionTypes.DELIVERY: 5,
+    constants.TransactionTypes.STOCK_LEVEL: 20,
+}
+DEFERRED_DELIVERY_LIMIT = 80
+
+## TPC-C 5.2.3 (page 55): minimum percentage of each transaction type in the mix
+MIX_MINIMUMS = {
+    constants.TransactionTypes.PAYMENT: 43.0,
+    constants.TransactionTypes.ORDER_STATUS: 4.0,
+    constants.TransactionTypes.DELIVERY: 4.0,
+    constants.TransactionTypes.STOCK_LEVEL: 4.0,
+}
+
+def errorName(error):
+    """Return the name that aborts are classified by: the exception's class,
+    qualified by its module unless it is a builtin"""
+    if error == None: return "Unknown"
+    cls = error.__class__
+    module = getattr(cls, "__module__", None)
+    if module in (None, "exceptions", "__builtin__", "builtins"): return cls.__name__
+    return "%s.%s" % (module, cls.__name__)
+## DEF
+
+## ==============================================
+## MeasurementWindow
+## ==============================================
+class MeasurementWindow:
+    """
+        Decides when the measurement interval of a Results starts and stops.
+        The interval starts after 'warmup' seconds, or as soon as the throughput
+        is stable if steady_state is set (with 'warmup' as the upper bound).
+        It lasts 'duration' seconds and is followed by 'cooldown' seconds during
+        which transactions still run but are not recorded.
+    """
+    
+    def __init__(self, r, duration, warmup = 0, cooldown = 0, steady_state = False):
+        self.r = r
+        self.duration = duration
+        self.warmup = warmup
+        self.cooldown = cooldown
+        self.steady_state = steady_state
+        self.end = None
+        self.samples = [ ]
+        self.last_sample = None
+        self.last_completed = 0
+    ## DEF
+    
+    def start(self):
+        """Start the benchmark in the given Results"""
+        start = self.r.startBenchmark(measure = (self.warmup <= 0))
+        self.last_sample = start
+        if self.warmup <= 0: self.end = start + self.duration
+        return start
+    ## DEF
+    
+    def update(self, now):
+        """Move the measurement interval forward. Returns false once the run is over."""
+        r = self.r
+        if self.end == None:
+            if now >= r.start + self.warmup or (self.steady_state and self.isSteady(now)):
+                r.startMeasurement(now)
+                self.end = now + self.duration
+            return True
+        ## IF
+        ## Without a cool-down the measurement stops with the benchmark
+        if now >= self.end and self.cooldown > 0 and r.measure_stop == None:
+            r.stopMeasurement(now)
+        return now < self.end + self.cooldown
+    ## DEF
+    
+    def isSteady(self, now):
+        """Sample the per-second throughput and check whether it is stable"""
+        if now < self.last_sample + 1: return False
+        self.samples.append((self.r.completed - self.last_completed) / (now - self.last_sample))
+        self.samples = self.samples[-2*STEADY_STATE_SAMPLES:]
+        self.last_completed = self.r.completed
+        self.last_sample = now
+        
+        if len(self.samples) < 2*STEADY_STATE_SAMPLES: return False
+        before = sum(self.samples[:STEADY_STATE_SAMPLES]) / STEADY_STATE_SAMPLES
+        after = sum(self.samples[STEADY_STATE_SAMPLES:]) / STEADY_STATE_SAMPLES
+        return before > 0 and abs(after - before) <= STEADY_STATE_TOLERANCE * before
+    ## DEF
+## CLASS
+
 class Results:
     
     def __init__(self):
         self.start = None
         self.stop = None
-        self.txn_id = 0
+        
+        ## Only transactions that start inside the measurement interval are recorded
+        self.measure_start = None
+        self.measure_stop = None
+        self.completed = 0
+        self.aborted = 0
         
         self.txn_counters = { }
         self.txn_times = { }
-        self.running = { }
+        self.txn_response_times = { }
+        self.txn_histograms = { }
+        self.open_loop = False
+        self.recorder = TimingRecorder()
+        
+        ## Optional per-interval timeline, see enableTimeSeries()
+        self.timeseries = None
+        
+        ## Deferred DELIVERY transactions executed by the delivery queue
+        self.deferred_counter = 0
+        self.deferred_errors = 0
+        self.deferred_queue_time = 0
+        self.deferred_completion_time = 0
+        self.deferred_histogram = Histogram()
+        
+        ## Statement timings of drivers with statement timing turned on,
+        ## {(txn, query name): [count, total time, Histogram]}
+        self.statement_stats = { }
+        
+        ## Measured aborts, {(txn, error class): [count, time spent in the failed attempts]}
+        self.txn_aborts = { }
+        
+        ## Measured retries of failed attempts, see runtime/retry.py
+        self.txn_retries = { }
         
-    def startBenchmark(self):
-        """Mark the benchmark as having been started"""
+    def enableTimeSeries(self, path = None, interval = 1.0):
+        """Keep per-interval buckets for the whole run, streaming them to path if given"""
+        self.timeseries = TimeSeries(path, interval)
+        
+    def startBenchmark(self, measure = True):
+        """Mark the benchmark as having been started. If measure is false, the
+        measurement interval has to be started later with startMeasurement()"""
         assert self.start == None
         logging.debug("Starting benchmark statistics collection")
         self.start = time.time()
+        if measure: self.measure_start = self.start
         return self.start
         
     def stopBenchmark(self):
@@ -51,31 +193,98 @@ class Results:
         assert self.stop == None
         logging.debug("Stopping benchmark statistics collection")
         self.stop = time.time()
+        if self.timeseries != None: self.timeseries.close()
+        self.collect()
+        if self.measure_start == None: self.measure_start = self.stop
+        if self.measure_stop == None: self.measure_stop = self.stop
+        
+    def startMeasurement(self, now):
+        """Start recording the transactions that start from now on"""
+        assert self.measure_start == None
+        logging.debug("Starting measurement interval after %.1f seconds" % (now - self.start))
+        self.measure_start = now
+        
+    def stopMeasurement(self, now):
+        """Stop recording the transactions that start from now on"""
+        assert self.measure_start != None
+        assert self.measure_stop == None
+        logging.debug("Stopping measurement interval after %.1f seconds" % (now - self.start))
+        self.measure_stop = now
+        
+    def isMeasured(self, when):
+        """Return true if a transaction that started at the given time is inside the measurement interval"""
+        if self.measure_start == None or when < self.measure_start: return False
+        return self.measure_stop == None or when < self.measure_stop
+        
+    def collect(self):
+        """Bring txn_counters, txn_times, txn_response_times and txn_histograms up to date"""
+        self.recorder.collect(self.txn_counters, self.txn_times, self.txn_response_times, self.txn_histograms)
+        
+    def startTransaction(self, txn, intended = None):
+        """Mark the start of a transaction. In open-loop mode, 'intended' is the
+        time at which the arrival schedule wanted the transaction to start.
+        Returns the id that has to be passed to stopTransaction or abortTransaction."""
+        now = self.recorder.start()
+        if intended == None:
+            intended = now
+        else:
+            self.open_loop = True
+        return (txn, now, intended)
+        
+    def abortTransaction(self, id, error = None):
+        """Record that a transaction was aborted by the given exception. The time of
+        the failed attempt is charged to the (txn, exception class) pair."""
+        txn_name, txn_start, txn_intended = id
+        self.aborted += 1
+        now = time.time()
+        if self.timeseries != None: self.timeseries.record(txn_name, now)
+        if not self.isMeasured(txn_intended): return
         
-    def startTransaction(self, txn):
-        self.txn_id += 1
-        id = self.txn_id
-        self.running[id] = (txn, time.time())
-        return id
+        key = (txn_name, errorName(error))
+        stats = self.txn_aborts.get(key)
+        if stats == None: stats = self.txn_aborts[key] = [ 0, 0.0 ]
+        stats[0] += 1
+        stats[1] += now - txn_start
         
-    def abortTransaction(self, id):
-        """Abort a transaction and discard its times"""
-        assert id in self.running
-        txn_name, txn_start = self.running[id]
-        del self.running[id]
+    def retryTransaction(self, id, retries = 1):
+        """Record that a transaction had to be retried. Its response time
+        still runs from the first attempt."""
+        txn_name, txn_start, txn_intended = id
+        if not self.isMeasured(txn_intended): return
+        self.txn_retries[txn_name] = self.txn_retries.get(txn_name, 0) + retries
         
     def stopTransaction(self, id):
         """Record that the benchmark completed an invocation of the given transaction"""
-        assert id in self.running
-        txn_name, txn_start = self.running[id]
-        del self.running[id]
+        txn_name, txn_start, txn_intended = id
+        self.completed += 1
+        now = time.time()
+        if self.timeseries != None: self.timeseries.record(txn_name, now, now - txn_intended)
+        if not self.isMeasured(txn_intended): return
+        
+        ## Service time starts when we send the transaction, response
+        ## time starts when it was supposed to be sent
+        self.recorder.record(txn_name, txn_start, txn_intended, now)
         
-        duration = time.time() - txn_start
-        total_time = self.txn_times.get(txn_name, 0)
-        self.txn_times[txn_name] = total_time + duration
+    def recordDeferred(self, count, errors, queue_time, completion_time, histogram = None):
+        """Record a batch of deferred DELIVERY transactions. The queue time is how long the
+        requests waited for a delivery worker, the completion time is measured from when
+        they were queued until the delivery finished."""
+        self.deferred_counter += count
+        self.deferred_errors += errors
+        self.deferred_queue_time += queue_time
+        self.deferred_completion_time += completion_time
+        if histogram != None: self.deferred_histogram.merge(histogram)
         
-        total_cnt = self.txn_counters.get(txn_name, 0)
-        self.txn_counters[txn_name] = total_cnt + 1
+    def recordStatements(self, stats):
+        """Add the statement timings of a driver, see AbstractDriver.getStatementStats()"""
+        if stats == None: return
+        for key, (cnt, total, hist) in stats.iteritems():
+            if not key in self.statement_stats: self.statement_stats[key] = [ 0, 0.0, Histogram() ]
+            mine = self.statement_stats[key]
+            mine[0] += cnt
+            mine[1] += total
+            mine[2].merge(hist)
+        ## FOR
         
     def append(self, r):
         for txn_name in r.txn_counters.keys():
@@ -84,11 +293,158 @@ class Results:
 
             self.txn_counters[txn_name] = orig_cnt + r.txn_counters[txn_name]
             self.txn_times[txn_name] = orig_time + r.txn_times[txn_name]
+            orig_response = self.txn_response_times.get(txn_name, 0)
+            self.txn_response_times[txn_name] = orig_response + r.txn_response_times[txn_name]
+            if not txn_name in self.txn_histograms: self.txn_histograms[txn_name] = Histogram()
+            self.txn_histograms[txn_name].merge(r.txn_histograms[txn_name])
             #logging.debug("%s [cnt=%d, time=%d]" % (txn_name, self.txn_counters[txn_name], self.txn_times[txn_name]))
-        ## HACK
-        self.start = r.start
-        self.stop = r.stop
+        self.open_loop = self.open_loop or r.open_loop
+        self.completed += r.completed
+        self.aborted += r.aborted
+        if r.timeseries != None:
+            if self.timeseries == None: self.timeseries = TimeSeries(None, r.timeseries.interval)
+            self.timeseries.merge(r.timeseries)
+        self.recordStatements(r.statement_stats)
+        for txn_name, retries in r.txn_retries.iteritems():
+            self.txn_retries[txn_name] = self.txn_retries.get(txn_name, 0) + retries
+        for key, (cnt, total) in r.txn_aborts.iteritems():
+            stats = self.txn_aborts.setdefault(key, [ 0, 0.0 ])
+            stats[0] += cnt
+            stats[1] += total
+        ## FOR
+        self.recordDeferred(r.deferred_counter, r.deferred_errors, r.deferred_queue_time, r.deferred_completion_time, r.deferred_histogram)
+        
+        ## The merged run and measurement interval span from the first client
+        ## that started to the last one that stopped. All the clients must use
+        ## the same clock, see shiftClock().
+        if self.start == None:
+            self.start, self.stop = r.start, r.stop
+            self.measure_start, self.measure_stop = r.measure_start, r.measure_stop
+        else:
+            self.start = min(self.start, r.start)
+            self.stop = max(self.stop, r.stop)
+            self.measure_start = min(self.measure_start, r.measure_start)
+            self.measure_stop = max(self.measure_stop, r.measure_stop)
+        
+    def shiftClock(self, offset):
+        """Move all the times by offset seconds, e.g. to put the results
+        of a remote client onto the coordinator's clock"""
+        self.start += offset
+        self.stop += offset
+        self.measure_start += offset
+        self.measure_stop += offset
+        if self.timeseries != None: self.timeseries.shift(offset)
             
+    def countAborts(self, txn = None):
+        """Return the number of measured aborts of the given transaction type, or of all of them"""
+        return sum([ stats[0] for key, stats in self.txn_aborts.iteritems() if txn == None or key[0] == txn ])
+        
+    def getAbortRate(self, txn = None):
+        """Return the percentage of the measured attempts of the given transaction type (or all) that aborted"""
+        aborts = self.countAborts(txn)
+        if txn == None: committed = sum(self.txn_counters.values())
+        else: committed = self.txn_counters.get(txn, 0)
+        return aborts * 100.0 / max(aborts + committed, 1)
+        
+    def getDuration(self):
+        """Return the length of the measurement interval in seconds"""
+        start = self.measure_start if self.measure_start != None else self.start
+        stop = self.measure_stop or self.stop or time.time()
+        return stop - start
+        
+    def checkCompliance(self):
+        """Check the measured transactions against the TPC-C response time limits and
+        mix minimums. Returns (tpmC, checks) where every check is a (name, value, op, limit, passed)
+        tuple and op is the comparison that has to hold between the value and the limit.
+        This driver has no keying or think times, so the tpmC is not an auditable number."""
+        minutes = max(self.getDuration(), 1e-6) / 60.0
+        total = sum(self.txn_counters.values())
+        tpmC = self.txn_counters.get(constants.TransactionTypes.NEW_ORDER, 0) / minutes
+        
+        checks = [ ]
+        p = RESPONSE_TIME_PERCENTILE
+        for txn in sorted(RESPONSE_TIME_LIMITS.keys()):
+            hist = self.txn_histograms.get(txn)
+            if hist == None: continue
+            value = hist.percentile(p) / 1000000.0
+            limit = RESPONSE_TIME_LIMITS[txn]
+            checks.append(("%s p%d response time" % (txn, p), value, "<=", limit, value <= limit))
+        ## FOR
+        if self.deferred_histogram.count > 0:
+            value = self.deferred_histogram.percentile(p) / 1000000.0
+            checks.append(("Deferred DELIVERY p%d completion" % p, value, "<=", DEFERRED_DELIVERY_LIMIT, value <= DEFERRED_DELIVERY_LIMIT))
+        ## IF
+        for txn in sorted(MIX_MINIMUMS.keys()):
+            value = self.txn_counters.get(txn, 0) * 100.0 / max(total, 1)
+            checks.append(("%s mix %%" % txn, value, ">=", MIX_MINIMUMS[txn], value >= MIX_MINIMUMS[txn]))
+        ## FOR
+        return (tpmC, checks)
+        
+    def export(self):
+        """Return the results as a dict of plain values that can be written as JSON.
+        Times are in seconds, except for latencies which are in microseconds."""
+        duration = max(self.getDuration(), 1e-6)
+        tpmC, checks = self.checkCompliance()
+        total_hist = Histogram()
+        txns = { }
+        for txn in sorted(self.txn_counters.keys()):
+            cnt = self.txn_counters[txn]
+            hist = self.txn_histograms[txn]
+            total_hist.merge(hist)
+            txns[txn] = {
+                "count": cnt,
+                "rate": cnt / duration,
+                "avg_service": self.txn_times[txn] / cnt * 1000000,
+                "avg_response": self.txn_response_times[txn] / cnt * 1000000,
+                "percentiles": dict([ (str(p), hist.percentile(p)) for p in PERCENTILES ]),
+                "max": hist.max,
+                "histogram": hist.sparse(),
+            }
+        ## FOR
+        return {
+            "start": self.start,
+            "stop": self.stop,
+            "measure_start": self.measure_start,
+            "measure_stop": self.measure_stop,
+            "duration": duration,
+            "completed": self.completed,
+            "aborted": self.aborted,
+            "open_loop": self.open_loop,
+            "txns": txns,
+            "compliance": {
+                "tpmC": tpmC,
+                "valid": all([ c[4] for c in checks ]),
+                "checks": [ { "name": c[0], "value": c[1], "op": c[2], "limit": c[3], "passed": c[4] } for c in checks ],
+            },
+            "total": {
+                "count": total_hist.count,
+                "rate": total_hist.count / duration,
+                "percentiles": dict([ (str(p), total_hist.percentile(p)) for p in PERCENTILES ]),
+                "max": total_hist.max,
+            },
+            "aborts": dict([ ("%s.%s" % key, {
+                "count": abort_cnt,
+                "time": abort_time,
+                "rate": abort_cnt * 100.0 / (self.countAborts(key[0]) + self.txn_counters.get(key[0], 0)),
+            }) for key, (abort_cnt, abort_time) in self.txn_aborts.iteritems() ]),
+            "abort_rate": self.getAbortRate(),
+            "retries": self.txn_retries,
+            "statements": dict([ ("%s.%s" % key, {
+                "count": stmt_cnt,
+                "avg": stmt_time / stmt_cnt * 1000000,
+                "percentiles": dict([ (str(p), stmt_hist.percentile(p)) for p in PERCENTILES ]),
+            }) for key, (stmt_cnt, stmt_time, stmt_hist) in self.statement_stats.iteritems() ]),
+            "deferred": {
+                "count": self.deferred_counter,
+                "errors": self.deferred_errors,
+                "queue_time": self.deferred_queue_time,
+                "completion_time": self.deferred_completion_time,
+                "percentiles": dict([ (str(p), self.deferred_histogram.percentile(p)) for p in PERCENTILES ]),
+            },
+            "timeseries": self.timeseries.toList() if self.timeseries != None else None,
+            "interval": self.timeseries.interval if self.timeseries != None else None,
+        }
+        
     def __str__(self):
         return self.show()
         
@@ -100,31 +456,122 @@ class Results:
         else:
             duration = self.stop - self.start
         
+        ## The rates are computed over the measurement interval only
+        window = None
+        if self.measure_start != None and (self.measure_start != self.start or self.measure_stop != self.stop):
+            window = (self.measure_start - self.start, (self.measure_stop or time.time()) - self.start)
+            duration = window[1] - window[0]
+        
+        ## Open-loop runs get an extra column with the response time
+        ## measured from the intended start time
+        cols = 5 if self.open_loop else 4
         col_width = 16
-        total_width = (col_width*4)+2
-        f = "\n  " + (("%-" + str(col_width) + "s")*4)
+        total_width = (col_width*cols)+2
+        f = "\n  " + (("%-" + str(col_width) + "s")*cols)
         line = "-"*total_width
 
         ret = u"" + "="*total_width + "\n"
         if load_time != None:
             ret += "Data Loading Time: %d seconds\n\n" % (load_time)
         
+        if window != None:
+            ret += "Measurement Interval: %.1f - %.1f seconds after start\n" % window
         ret += "Execution Results after %d seconds\n%s" % (duration, line)
-        ret += f % ("", "Executed", u"Avg. RT (µs)", "Rate")
+        if self.open_loop:
+            ret += f % ("", "Executed", u"Avg. ST (µs)", u"Avg. RT (µs)", "Rate")
+        else:
+            ret += f % ("", "Executed", u"Avg. RT (µs)", "Rate")
         
         total_time = 0
+        total_response = 0
         total_cnt = 0
         for txn in sorted(self.txn_counters.keys()):
             txn_time = self.txn_times[txn]
+            txn_response = self.txn_response_times[txn]
             txn_cnt = self.txn_counters[txn]
             rate = u"%.02f txn/s" % ((txn_cnt / duration))
-            ret += f % (txn, str(txn_cnt), str(txn_time / txn_cnt * 1000000), rate)
+            if self.open_loop:
+                ret += f % (txn, str(txn_cnt), str(txn_time / txn_cnt * 1000000), str(txn_response / txn_cnt * 1000000), rate)
+            else:
+                ret += f % (txn, str(txn_cnt), str(txn_time / txn_cnt * 1000000), rate)
             
             total_time += txn_time
+            total_response += txn_response
             total_cnt += txn_cnt
         ret += "\n" + ("-"*total_width)
         total_rate = "%.02f txn/s" % ((total_cnt / duration))
-        ret += f % ("TOTAL", str(total_cnt), str(total_time / total_cnt * 1000000), total_rate)
+        if self.open_loop:
+            ret += f % ("TOTAL", str(total_cnt), str(total_time / total_cnt * 1000000), str(total_response / total_cnt * 1000000), total_rate)
+        else:
+            ret += f % ("TOTAL", str(total_cnt), str(total_time / total_cnt * 1000000), total_rate)
+
+        ## Response time percentiles
+        fp = "\n  " + (("%-" + str(col_width) + "s")*(len(PERCENTILES)+2))
+        total_hist = Histogram()
+        ret += u"\n\nResponse Time Percentiles (µs)\n%s" % line
+        ret += fp % tuple([ "" ] + [ "p%s" % p for p in PERCENTILES ] + [ "Max" ])
+        for txn in sorted(self.txn_histograms.keys()):
+            hist = self.txn_histograms[txn]
+            total_hist.merge(hist)
+            ret += fp % tuple([ txn ] + [ str(hist.percentile(p)) for p in PERCENTILES ] + [ str(hist.max) ])
+        ret += "\n" + ("-"*total_width)
+        ret += fp % tuple([ "TOTAL" ] + [ str(total_hist.percentile(p)) for p in PERCENTILES ] + [ str(total_hist.max) ])
+
+        if self.deferred_counter > 0 or self.deferred_errors > 0:
+            fd = "\n  " + (("%-" + str(col_width) + "s")*5)
+            ret += "\n\nDeferred DELIVERY Results\n%s" % line
+            ret += fd % ("", "Completed", "Failed", u"Avg. Queue (µs)", u"Avg. Done (µs)")
+            cnt = max(self.deferred_counter, 1)
+            ret += fd % ("DELIVERY", str(self.deferred_counter), str(self.deferred_errors),
+                         str(self.deferred_queue_time / cnt * 1000000), str(self.deferred_completion_time / cnt * 1000000))
+        ## IF
+
+        ## Aborts by exception class
+        if self.txn_aborts:
+            fa = "\n  %-16s%-40s" + (("%-" + str(col_width) + "s")*3)
+            ret += "\n\nAborted Transactions\n%s" % ("-"*(total_width+26))
+            ret += fa % ("", "", "Aborted", "Abort Rate", u"Avg. Time (µs)")
+            for txn, error in sorted(self.txn_aborts.keys()):
+                cnt, total = self.txn_aborts[(txn, error)]
+                rate = cnt * 100.0 / (self.countAborts(txn) + self.txn_counters.get(txn, 0))
+                ret += fa % (txn, error, str(cnt), "%.2f%%" % rate, str(int(total / cnt * 1000000)))
+            ret += "\n" + ("-"*(total_width+26))
+            ret += fa % ("TOTAL", "", str(self.countAborts()), "%.2f%%" % self.getAbortRate(), "")
+        ## IF
+
+        ## Retries, per attempt of the transactions that committed or aborted
+        if self.txn_retries:
+            fr = "\n  " + (("%-" + str(col_width) + "s")*3)
+            ret += "\n\nRetried Transactions\n%s" % line
+            ret += fr % ("", "Retries", "Attempts/Txn")
+            for txn in sorted(self.txn_retries.keys()):
+                retries = self.txn_retries[txn]
+                done = self.txn_counters.get(txn, 0) + self.countAborts(txn)
+                ret += fr % (txn, str(retries), "%.3f" % (1 + retries / float(max(done, 1))))
+        ## IF
+
+        ## Statement timings
+        if self.statement_stats:
+            fs = "\n  %-16s%-26s" + (("%-" + str(col_width) + "s")*4)
+            ret += u"\n\nStatement Response Times (µs)\n%s" % ("-"*(total_width+26))
+            ret += fs % ("", "", "Executed", "Avg", "p50", "p99")
+            for txn, name in sorted(self.statement_stats.keys()):
+                cnt, total, hist = self.statement_stats[(txn, name)]
+                ret += fs % (txn, name, str(cnt), str(int(total / cnt * 1000000)), str(hist.percentile(50)), str(hist.percentile(99)))
+        ## IF
+
+        ## TPC-C compliance
+        if total_cnt > 0:
+            tpmC, checks = self.checkCompliance()
+            fc = "\n  " + "%-40s%-16s%-16s%s"
+            ret += "\n\nTPC-C Compliance\n%s" % line
+            ret += fc % ("", "Measured", "Limit", "")
+            for name, value, op, limit, passed in checks:
+                ret += fc % (name, "%.3f" % value, "%s %s" % (op, limit), "OK" if passed else "FAILED")
+            ret += "\n" + ("-"*total_width)
+            valid = all([ c[4] for c in checks ])
+            ret += "\n  %-40s%-16s%s" % ("tpmC", "%.2f" % tpmC, "VALID" if valid else "INVALID")
+        ## IF
 
         return (ret.encode('utf-8'))
 ## CLASS
\ No newline at end of file
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------
+# Copyright (C) 2011
+# Andy Pavlo
+# http://www.cs.brown.edu/~pavlo/
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT
+# IN NO EVENT SHALL THE AUTHORS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+# -----------------------------------------------------------------------
+
+import json
+import logging
+
+from histogram import Histogram, fromSparse
+
+## ==============================================
+## TimeSeries
+## ==============================================
+class TimeSeries:
+    """
+        Per-interval throughput and latency buckets for every transaction type.
+        Buckets are keyed by wall-clock interval, so the timelines of several
+        clients line up when they are merged. Each finished bucket is appended
+        to the output file as one JSON line while the run is in progress:
+            {"time": <interval start>, "txns": {<txn>: {"count": n, "errors": n, "hist": {<bucket>: n}}}}
+        where "hist" holds the non-empty buckets of a util.histogram.Histogram.
+        Only the current interval has full Histograms. Once it is over, it is
+        written out and only its sparse form is kept in 'buckets', so a long
+        run does not hold thousands of dense histograms in memory.
+    """
+
+    def __init__(self, path = None, interval = 1.0):
+        assert interval > 0
+        self.interval = interval
+        ## {idx: {txn: [count, errors, {histogram bucket: count}]}}
+        self.buckets = { }
+        self.current = None
+        self.live = None
+        self.output = None
+        if path != None:
+            logging.debug("Streaming time series to '%s'" % path)
+            self.output = open(path, "w")
+    ## DEF
+
+    def record(self, txn, now, latency = None):
+        """Record a transaction that finished at the given time. Transactions
+        without a latency are counted as errors."""
+        idx = int(now / self.interval)
+        if idx != self.current:
+            self.flush()
+            self.current = idx
+            self.live = { }
+        stats = self.live.get(txn)
+        if stats == None:
+            stats = self.live[txn] = [ 0, 0, Histogram() ]
+        if latency == None:
+            stats[1] += 1
+        else:
+            stats[0] += 1
+            stats[2].record(latency)
+    ## DEF
+
+    def flush(self):
+        """Close the current bucket: keep its sparse form and append it to the output file"""
+        if self.current == None: return
+        live = dict([ (txn, [ stats[0], stats[1], stats[2].sparse() ]) for txn, stats in self.live.iteritems() ])
+        self.addBucket(self.current, live)
+        if self.output != None:
+            self.output.write(self.formatBucket(self.current) + "\n")
+            self.output.flush()
+        self.current = None
+        self.live = None
+    ## DEF
+
+    def close(self):
+        self.flush()
+        if self.output != None: self.output.close()
+        self.output = None
+    ## DEF
+
+    def addBucket(self, idx, bucket):
+        """Add a bucket in sparse form to the one at idx"""
+        mine = self.buckets.setdefault(idx, { })
+        for txn, (count, errors, sparse) in bucket.iteritems():
+            if not txn in mine:
+                mine[txn] = [ 0, 0, { } ]
+            stats = mine[txn]
+            stats[0] += count
+            stats[1] += errors
+            for i, cnt in sparse.iteritems():
+                i = int(i)
+                stats[2][i] = stats[2].get(i, 0) + cnt
+        ## FOR
+    ## DEF
+
+    def merge(self, other):
+        """Merge the buckets of another, closed, time series into this one"""
+        assert self.interval == other.interval
+        assert other.current == None, "The time series has to be closed before it is merged"
+        for idx, bucket in other.buckets.iteritems():
+            self.addBucket(idx, bucket)
+    ## DEF
+
+    def shift(self, offset):
+        """Move every bucket by offset seconds, rounded to whole intervals"""
+        steps = int(round(offset / self.interval))
+        if steps == 0: return
+        self.buckets = dict([ (idx + steps, bucket) for idx, bucket in self.buckets.iteritems() ])
+    ## DEF
+
+    def formatBucket(self, idx):
+        return json.dumps(self.bucketDict(idx), sort_keys=True)
+    ## DEF
+
+    def bucketDict(self, idx):
+        txns = { }
+        for txn, stats in self.buckets[idx].iteritems():
+            txns[txn] = { "count": stats[0], "errors": stats[1], "hist": stats[2] }
+        return { "time": idx * self.interval, "txns": txns }
+    ## DEF
+
+    def toList(self):
+        """Return every bucket in time order, in the same format that is streamed"""
+        return [ self.bucketDict(idx) for idx in sorted(self.buckets.keys()) ]
+    ## DEF
+
+    def write(self, path):
+        """Write the whole timeline to the given file, in the same format that is streamed"""
+        with open(path, "w") as output:
+            for idx in sorted(self.buckets.keys()):
+                output.write(self.formatBucket(idx) + "\n")
+        ## WITH
+    ## DEF
+
+    def writeCsv(self, path, percentiles):
+        """Write one row per interval and transaction type with the given latency percentiles in microseconds"""
+        with open(path, "w") as output:
+            output.write(",".join([ "time", "txn", "count", "errors", "abort_rate" ] + [ "p%s" % p for p in percentiles ]) + "\n")
+            for idx in sorted(self.buckets.keys()):
+                for txn in sorted(self.buckets[idx].keys()):
+                    count, errors, sparse = self.buckets[idx][txn]
+                    hist = fromSparse(sparse)
+                    abort_rate = "%.4f" % (errors / float(count + errors))
+                    row = [ idx * self.interval, txn, count, errors, abort_rate ] + [ hist.percentile(p) for p in percentiles ]
+                    output.write(",".join(map(str, row)) + "\n")
+            ## FOR
+        ## WITH
+    ## DEF
+## CLASS
+
+def fromList(buckets, interval = 1.0):
+    """Rebuild a TimeSeries from the output of TimeSeries.toList() or the lines of a streamed file"""
+    ts = TimeSeries(None, interval)
+    for bucket in buckets:
+        idx = int(round(bucket["time"] / interval))
+        ts.addBucket(idx, dict([ (txn, [ stats["count"], stats["errors"], stats["hist"] ]) \
+                                 for txn, stats in bucket["txns"].iteritems() ]))
+    ## FOR
+    return ts
+## DEF
@@ -37,6 +37,7 @@ import time
 import message
 import pickle
 import traceback
+import socket
 from pprint import pprint,pformat
 
 from util import *
@@ -96,7 +97,18 @@ def executorFunc(driverClass, scaleParameters, args, config, debug):
     config['reset'] = False
     driver.loadConfig(config)
 
-    e = executor.Executor(driver, scaleParameters, stop_on_error=args['stop_on_error'])
+    mix = [ int(i) for i in args.get('mix', '4,4,4,43,45').split(',') ]
+
+    ## Every worker streams its own time series, the coordinator merges them.
+    ## It is only kept when asked for, --export on its own needs the aggregates only
+    timeseries = None
+    interval = None
+    if args.get('timeseries'):
+        timeseries = "%s.%s.%d" % (args['timeseries'], socket.gethostname(), os.getpid())
+        interval = args.get('interval', 1.0)
+
+    e = executor.Executor(driver, scaleParameters, mix, stop_on_error=args['stop_on_error'],
+                          timeseries=timeseries, interval=interval)
     driver.executeStart()
     results = e.execute(args['duration'])
     driver.executeFinish()
@@ -140,6 +152,11 @@ if __name__=='__channelexec__':
            m=message.Message(header=message.EXECUTE_COMPLETED,data=results)
            channel.send(pickle.dumps(m,-1))
            
+       elif command.header==message.CMD_PING:
+           ## Reply with our clock so that the coordinator can estimate the offset
+           m=message.Message(header=message.PING_REPLY,data=time.time())
+           channel.send(pickle.dumps(m,-1))
+
        elif command.header==message.CMD_STOP:
 	   pass
        else: